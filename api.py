@@ -0,0 +1,154 @@
+"""Read-only JSON API over the numbers behind the dashboard.
+
+Other tools can read the aggregates here instead of scraping the rendered
+views. The endpoints are served by the dashboard's Flask server under
+``/api/v1``:
+
+    GET /api/v1/products               products with their totals
+    GET /api/v1/aggregates/<product>   KPI totals and yearly units, revenue and price
+    GET /api/v1/forecasts/<product>    forecast units with their interval and revenue KPIs
+
+``<product>`` is a product name or ``all``. ``?start=`` and ``?end=``
+limit the years (inclusive); the forecast revenue KPIs always cover the
+whole horizon. Missing values are ``null``, and errors come back as
+``{"error": ...}``.
+
+Each response carries the data version of the snapshot it was built from
+as its ETag. The ETag is weak because compression may re-encode the body.
+A request whose ``If-None-Match`` still matches the current version gets a
+304 before anything is computed.
+"""
+import numpy as np
+from flask import Blueprint, Response, abort, jsonify, request
+from werkzeug.exceptions import HTTPException
+
+from sales_cube import ALL, PRICE, REVENUE, UNITS
+
+PREFIX = '/api/v1'
+
+
+def numbers(values):
+    """JSON-safe list of ``values``; NaN becomes None"""
+    return [None if np.isnan(value) else float(value) for value in np.asarray(values, dtype='float64')]
+
+
+def year_mask(years):
+    """Boolean mask of ``years`` within the request's ``start``/``end`` bounds"""
+    years = np.asarray(years)
+    mask = np.ones(len(years), dtype=bool)
+    for name, keep in (('start', np.greater_equal), ('end', np.less_equal)):
+        value = request.args.get(name)
+        if value is None:
+            continue
+        try:
+            mask &= keep(years, int(value))
+        except ValueError:
+            abort(400, description=f"{name} must be a year, got {value!r}")
+    return mask
+
+
+def product_position(data, product):
+    if product != ALL and product not in data.cube.index:
+        abort(404, description=f"Unknown product {product!r}")
+    return None if product == ALL else data.cube.index[product]
+
+
+def aggregates(data, product):
+    """Totals and yearly series of ``product`` ('all' for every product) in the requested years"""
+    position = product_position(data, product)
+    mask = year_mask(data.cube.periods)
+    values = data.cube.values[mask]
+    if position is None:
+        units = values[:, :, UNITS].sum(axis=1)
+        revenue = values[:, :, REVENUE].sum(axis=1)
+        # Revenue-weighted average price across products, as on the trends view
+        with np.errstate(invalid='ignore', divide='ignore'):
+            price = revenue / units
+        product_units = values[:, :, UNITS].sum(axis=0)
+    else:
+        units = values[:, position, UNITS]
+        revenue = values[:, position, REVENUE]
+        price = values[:, position, PRICE]
+        product_units = units.sum(keepdims=True)
+
+    products = data.cube.products if position is None else [product]
+    return {
+        'product': product,
+        'years': data.cube.periods[mask].tolist(),
+        'units': numbers(units),
+        'revenue': numbers(revenue),
+        'price': numbers(price),
+        'total_sales': int(np.nansum(units)),
+        'yearly_avg': int(np.nanmean(units)) if len(units) else 0,
+        'total_revenue': float(revenue.sum()),
+        'top_coffee': products[int(np.argmax(product_units))] if len(units) else None,
+        'by_product': {name: {'units': int(np.nansum(total))} for name, total in zip(products, product_units)}
+    }
+
+
+def forecasts(data, product):
+    """Forecast units, intervals and revenue KPIs.
+
+    ``ready`` is False while a forecast is still being fitted. Products whose fit failed are listed as
+    ``unavailable`` once the fits are done, and left out of the 'all' totals.
+    """
+    position = product_position(data, product)
+    names = data.cube.products if position is None else [product]
+    mask = year_mask(data.future_years)
+    current_total, forecasted_total, growth_rate, excluded = data.forecast_kpis[product]
+    series = {}
+    for name in names:
+        entry = data.forecasts.get(name)
+        if entry is not None:
+            series[name] = {key: numbers(np.asarray(entry[key])[mask]) for key in ('forecast', 'lower', 'upper')}
+    return {
+        'product': product,
+        'years': np.asarray(data.future_years)[mask].tolist(),
+        'ready': data.forecasts_ready or len(series) == len(names),
+        'unavailable': [name for name in names if name not in series] if data.forecasts_ready else [],
+        'current_total': current_total,
+        'forecasted_total': forecasted_total,
+        'growth_rate': growth_rate,
+        'forecasts': series
+    }
+
+
+def products(data):
+    return {
+        'products': [
+            dict(name=item.name, color=item.color, **{
+                key: value for key, value in data.cube.summary(item.name).items()
+                if key in ('total_sales', 'yearly_avg', 'total_revenue')
+            })
+            for item in data.catalog
+        ]
+    }
+
+
+def conditional(current, build, *args):
+    """``build(data, *args)`` as JSON tagged with the data version, or a bare 304 when the client has it"""
+    data = current()
+    if request.if_none_match.contains_weak(data.version):
+        response = Response(status=304)
+    else:
+        response = jsonify(dict(build(data, *args), version=data.version))
+    response.set_etag(data.version, weak=True)
+    # Clients may keep the body but must revalidate it, which costs only the version check
+    response.cache_control.no_cache = True
+    return response
+
+
+def error(exception):
+    return jsonify(error=exception.description), exception.code
+
+
+def install(server, current):
+    """Serve the API from ``server``; ``current()`` returns the ``DataSnapshot`` to answer from"""
+    api = Blueprint('api', __name__, url_prefix=PREFIX)
+    api.add_url_rule('/products', 'products', lambda: conditional(current, products))
+    api.add_url_rule('/aggregates/<product>', 'aggregates',
+                     lambda product: conditional(current, aggregates, product))
+    api.add_url_rule('/forecasts/<product>', 'forecasts', lambda product: conditional(current, forecasts, product))
+    api.register_error_handler(HTTPException, error)
+    server.register_blueprint(api)
+    return server
@@ -1,82 +1,38 @@
+import os
+import threading
+
 import dash
-from dash import dcc, html, Input, Output, State, callback
+from dash import dcc, html, Input, Output, State, ALL, ClientsideFunction, callback
 import dash_bootstrap_components as dbc
 import plotly.graph_objs as go
-import plotly.express as px
 import numpy as np
-import pandas as pd
-from statsmodels.tsa.arima.model import ARIMA
-
-np.random.seed(42)
-years = list(range(2014, 2026))  # 2014 to 2025
-coffee_types = ['Espresso', 'Latte', 'Cappuccino']
-
-base_pattern = np.sin(np.linspace(0, 2 * np.pi, 12)) * 0.3 + 0.7
-growth_trend = np.linspace(0.8, 1.2, 12)
-
-espresso_sales = (np.random.normal(5000, 500, 12) * base_pattern * growth_trend).astype(int)
-latte_sales = (np.random.normal(5500, 450, 12) * base_pattern * growth_trend).astype(int)
-cappuccino_sales = (np.random.normal(4500, 400, 12) * (base_pattern[::-1] * growth_trend)).astype(int)
-
-espresso_prices = np.round(np.random.normal(80.5, 2.5, 12) * (growth_trend * 0.2 + 0.9), 2)
-latte_prices = np.round(np.random.normal(60.5, 2.0, 12) * (growth_trend * 0.2 + 0.9), 2)
-cappuccino_prices = np.round(np.random.normal(75.2, 2.2, 12) * (growth_trend * 0.2 + 0.9), 2)
-
-sales_data = pd.DataFrame({
-    'Year': years,
-    'Espresso': espresso_sales,
-    'Latte': latte_sales,
-    'Cappuccino': cappuccino_sales,
-    'EspressoPrice': espresso_prices,
-    'LattePrice': latte_prices,
-    'CappuccinoPrice': cappuccino_prices
-})
-
-sales_data['Total'] = sales_data['Espresso'] + sales_data['Latte'] + sales_data['Cappuccino']
-sales_data['Revenue'] = (sales_data['Espresso'] * sales_data['EspressoPrice'] +
-                         sales_data['Latte'] * sales_data['LattePrice'] +
-                         sales_data['Cappuccino'] * sales_data['CappuccinoPrice'])
-
-total_by_coffee = {
-    'Type': coffee_types,
-    'Sales': [sales_data['Espresso'].sum(), sales_data['Latte'].sum(), sales_data['Cappuccino'].sum()]
-}
 
-top_year_idx = sales_data['Total'].argmax()
-top_year = sales_data.iloc[top_year_idx]['Year']
-top_product = coffee_types[np.argmax([sales_data['Espresso'].sum(),
-                                     sales_data['Latte'].sum(),
-                                     sales_data['Cappuccino'].sum()])]
-
-sales_long = pd.melt(
-    sales_data,
-    id_vars=['Year'],
-    value_vars=coffee_types,
-    var_name='Coffee Type',
-    value_name='Sales'
-)
+import api
+import compression
+import figures
+import prerender
+import view_patch
+from catalog import with_alpha
+from data_snapshot import DataSnapshot, from_shared, load_cube, unit_series
+from data_watcher import DataWatcher
+from forecasting import HORIZON, ForecastStore
+from sales_cube import PRICE
+from shared_store import SharedSnapshotStore
+from single_flight import SingleFlight
+from view_cache import ViewCache
 
-price_long = pd.melt(
-    sales_data,
-    id_vars=['Year'],
-    value_vars=['EspressoPrice', 'LattePrice', 'CappuccinoPrice'],
-    var_name='Coffee Type',
-    value_name='Price'
-)
-price_long['Coffee Type'] = price_long['Coffee Type'].str.replace('Price', '')
+np.random.seed(42)
 
-future_years = [2026, 2027, 2028, 2029]
-prediction_years = years + future_years
+# Switch the coffee filter in the browser instead of re-rendering on the server (see assets/filters.js)
+CLIENTSIDE_FILTERS = os.environ.get('DASHBOARD_CLIENTSIDE_FILTERS', '') not in ('', '0', 'false')
 
-def predict_future_values(data, periods=4):
-    model = ARIMA(data, order=(1, 0, 0))
-    model_fit = model.fit()
-    forecast = model_fit.forecast(steps=periods)
-    return list(forecast)
+# Point DASHBOARD_DATA_PATH at a transaction file, directory or glob to use real
+# point-of-sale history; the synthetic demo data is used when it is unset.
+DATA_PATH = os.environ.get('DASHBOARD_DATA_PATH')
 
-espresso_predictions = list(espresso_sales) + predict_future_values(espresso_sales)
-latte_predictions = list(latte_sales) + predict_future_values(latte_sales)
-cappuccino_predictions = list(cappuccino_sales) + predict_future_values(cappuccino_sales)
+# Name of the shared-memory store a refresher.py process publishes the data to; when set, every process
+# reads that one copy instead of loading the data and fitting forecasts itself
+SHARED_STORE = os.environ.get('DASHBOARD_SHARED_STORE')
 
 colors = {
     'background': '#FAF7F0',  # Light cream
@@ -94,12 +50,108 @@ colors = {
     'info': '#4682B4'         # SteelBlue
 }
 
-coffee_colors = {
+figures.register_template(colors['card_bg'], colors['text'])
+
+fixed_colors = {
     'Espresso': colors['espresso'],
     'Latte': colors['latte'],
     'Cappuccino': colors['cappuccino']
 }
 
+# The data every view renders from (see data_snapshot); replaced as a whole, never modified
+snapshot = None
+shared_version = None
+watcher = None
+_swap_lock = threading.Lock()
+_reload_lock = threading.Lock()
+
+if SHARED_STORE:
+    shared_store = SharedSnapshotStore.attach(SHARED_STORE, timeout=60)
+    forecast_store = None
+else:
+    shared_store = None
+    sales_cube = load_cube(DATA_PATH)
+    snapshot = DataSnapshot(sales_cube, fixed_colors=fixed_colors)
+
+    # Forecasts are read from the on-disk cache or fitted on a background thread;
+    # the predictions view shows the history until they are available.
+    forecast_store = ForecastStore(unit_series(sales_cube), periods=HORIZON)
+
+    @forecast_store.subscribe
+    def publish_forecasts(store):
+        global snapshot
+        snapshot = DataSnapshot(sales_cube, store.forecasts, store.ready, store.version, fixed_colors)
+
+    forecast_store.start()
+
+
+def swap_shared_snapshot():
+    """Build a snapshot over the latest published arrays and make it current; called holding ``_swap_lock``"""
+    global snapshot, shared_version
+    try:
+        shared = shared_store.snapshot()
+        if shared.version != shared_version:
+            previous = snapshot
+            snapshot = from_shared(shared, fixed_colors)
+            shared_version = shared.version
+            if previous is not None:
+                warm_view_cache(snapshot)
+    finally:
+        _swap_lock.release()
+
+
+def current():
+    """The snapshot to render from.
+
+    When the refresher has published a newer one, it is built on a background
+    thread and this keeps returning the previous snapshot until it is ready,
+    so no request waits for a reload.
+    """
+    try:
+        changed = shared_store is not None and shared_store.version != shared_version
+    except TimeoutError:
+        if snapshot is None:
+            raise
+        # The refresher stopped halfway through a publish; keep serving the last complete snapshot
+        changed = False
+    if changed:
+        if snapshot is None:
+            _swap_lock.acquire()
+            swap_shared_snapshot()
+        elif _swap_lock.acquire(blocking=False):
+            threading.Thread(target=swap_shared_snapshot, name='snapshot-swap', daemon=True).start()
+    return snapshot
+
+
+def reload_data():
+    """Load the data files again and swap in a snapshot of them; runs on the watcher thread, never in a request"""
+    global sales_cube
+    cube = load_cube(DATA_PATH)
+    with _reload_lock:
+        if cube.version == sales_cube.version:
+            return False
+        # A fit still running on the old data lands before the series are replaced
+        forecast_store.wait()
+        sales_cube = cube
+        # refresh() publishes, which rebuilds the snapshot around the new cube with the forecasts of the
+        # unchanged series carried over; when no series changed (e.g. only prices did) publish here
+        if not forecast_store.refresh(unit_series(cube)):
+            publish_forecasts(forecast_store)
+            warm_view_cache(snapshot)
+    return True
+
+
+def start_watcher():
+    """Reload whenever the files at DASHBOARD_DATA_PATH change; for the single-process development server.
+
+    With a shared store the refresher watches the files instead, and gunicorn relies on that (see wsgi.py).
+    """
+    global watcher
+    if DATA_PATH and forecast_store is not None and watcher is None:
+        watcher = DataWatcher(DATA_PATH, reload_data).start()
+    return watcher
+
+
 card_style = {
     'backgroundColor': colors['card_bg'],
     'borderRadius': '8px',
@@ -113,12 +165,15 @@ app = dash.Dash(
         dbc.themes.BOOTSTRAP,
         dbc.icons.FONT_AWESOME,
         "https://fonts.googleapis.com/css2?family=Playfair+Display:wght@400;700&family=Raleway:wght@300;400;500&display=swap"
-    ]
+    ],
+    # serve_layout() already renders the initial state (dashboard view, all products, matching nav and
+    # filter highlights), so no callback needs to run on page load
+    prevent_initial_callbacks=True
 )
-server = app.server
+server = compression.install(app.server)
+api.install(server, current)
 # ---------------------- LAYOUT COMPONENTS ----------------------
 # Current time and user - UPDATED
-current_time = "from 2014 to 2025"
 current_user1 = "Jessica Julian"
 current_user2 = "Twinkie Belario"
 
@@ -194,96 +249,80 @@ avatar_section = html.Div([
     ])
 ], style={'marginBottom': '20px', 'padding': '5px'})
 
-sidebar = html.Div([
-    avatar_section,
-    html.Hr(style={'margin': '0 0 15px 0'}),
-
-    html.H6("NAVIGATION", style={'fontSize': '12px', 'color': '#777', 'fontWeight': 'bold', 'marginLeft': '5px'}),
-    dbc.Nav([
-        dbc.NavLink([
-            html.I(className="fas fa-home me-2"),
-            "Dashboard"
-        ], href="#", active=True, id="nav-dashboard", className="sidebar-link"),
-        dbc.NavLink([
-            html.I(className="fas fa-chart-line me-2"),
-            "Trends"
-        ], href="#", active=False, id="nav-trends", className="sidebar-link"),
-        dbc.NavLink([
-            html.I(className="fas fa-chart-area me-2"),
-            "Predictions"
-        ], href="#", active=False, id="nav-predictions", className="sidebar-link"),
-    ], vertical=True, pills=True, className="mb-3"),
-
-    html.Hr(style={'margin': '15px 0'}),
-
-    # Coffee Filter Section
-    # 修改咖啡过滤部分
-    html.H6("FILTER BY COFFEE", style={'fontSize': '12px', 'color': '#777', 'fontWeight': 'bold', 'marginLeft': '5px'}),
-    dbc.Nav([
-        dbc.NavLink([
-            html.Div(style={
-                'width': '10px',
-                'height': '10px',
-                'borderRadius': '50%',
-                'backgroundColor': colors['espresso'],
-                'display': 'inline-block',
-                'marginRight': '10px'
-            }),
-            "Espresso"
-        ], href="#", active=False, id="filter-espresso", className="sidebar-link"),
-        dbc.NavLink([
-            html.Div(style={
-                'width': '10px',
-                'height': '10px',
-                'borderRadius': '50%',
-                'backgroundColor': colors['latte'],
-                'display': 'inline-block',
-                'marginRight': '10px'
-            }),
-            "Latte"
-        ], href="#", active=False, id="filter-latte", className="sidebar-link"),
-        dbc.NavLink([
-            html.Div(style={
-                'width': '10px',
-                'height': '10px',
-                'borderRadius': '50%',
-                'backgroundColor': colors['cappuccino'],
-                'display': 'inline-block',
-                'marginRight': '10px'
-            }),
-            "Cappuccino"
-        ], href="#", active=False, id="filter-cappuccino", className="sidebar-link"),
-        dbc.NavLink([
-            html.I(className="fas fa-undo me-2"),
-            "Show All"
-        ], href="#", active=True, id="filter-all", className="sidebar-link"),
-    ], vertical=True, pills=True),
+def filter_nav_link(product):
+    return dbc.NavLink([
+        html.Div(style={
+            'width': '10px',
+            'height': '10px',
+            'borderRadius': '50%',
+            'backgroundColor': product.color,
+            'display': 'inline-block',
+            'marginRight': '10px'
+        }),
+        product.name
+    ], href="#", active=False, id={'type': 'coffee-filter', 'index': product.slug}, className="sidebar-link")
+
+
+def build_sidebar(data):
+    return html.Div([
+        avatar_section,
+        html.Hr(style={'margin': '0 0 15px 0'}),
+
+        html.H6("NAVIGATION", style={'fontSize': '12px', 'color': '#777', 'fontWeight': 'bold', 'marginLeft': '5px'}),
+        dbc.Nav([
+            dbc.NavLink([
+                html.I(className="fas fa-home me-2"),
+                "Dashboard"
+            ], href="#", active=True, id="nav-dashboard", className="sidebar-link"),
+            dbc.NavLink([
+                html.I(className="fas fa-chart-line me-2"),
+                "Trends"
+            ], href="#", active=False, id="nav-trends", className="sidebar-link"),
+            dbc.NavLink([
+                html.I(className="fas fa-chart-area me-2"),
+                "Predictions"
+            ], href="#", active=False, id="nav-predictions", className="sidebar-link"),
+        ], vertical=True, pills=True, className="mb-3"),
+
+        html.Hr(style={'margin': '15px 0'}),
+
+        # Coffee Filter Section
+        # 修改咖啡过滤部分
+        html.H6("FILTER BY COFFEE", style={'fontSize': '12px', 'color': '#777', 'fontWeight': 'bold', 'marginLeft': '5px'}),
+        dbc.Nav([
+            *[filter_nav_link(product) for product in data.catalog],
+            dbc.NavLink([
+                html.I(className="fas fa-undo me-2"),
+                "Show All"
+            ], href="#", active=True, id="filter-all", className="sidebar-link"),
+        ], vertical=True, pills=True),
+
+        html.Hr(style={'margin': '15px 0'}),
+
+        # Time indicator
+        html.Div([
+            html.Small([
+                html.I(className="fas fa-clock me-1", style={'color': colors['accent1']}),
+                f"from {data.years[0]} to {data.years[-1]}"
+            ], style={'color': '#777', 'fontSize': '10px'})
+        ], style={'marginTop': 'auto', 'textAlign': 'center'})
 
-    html.Hr(style={'margin': '15px 0'}),
+    ], style={
+        'width': '300px',
+        'height': '100vh',
+        'position': 'fixed',
+        'top': '0',
+        'left': '0',
+        'backgroundColor': colors['sidebar'],
+        'paddingTop': '15px',
+        'paddingBottom': '15px',
+        'paddingLeft': '15px',
+        'paddingRight': '15px',
+        'display': 'flex',
+        'flexDirection': 'column',
+        'overflowY': 'auto'
+    })
 
-    # Time indicator
-    html.Div([
-        html.Small([
-            html.I(className="fas fa-clock me-1", style={'color': colors['accent1']}),
-            current_time
-        ], style={'color': '#777', 'fontSize': '10px'})
-    ], style={'marginTop': 'auto', 'textAlign': 'center'})
-
-], style={
-    'width': '300px',
-    'height': '100vh',
-    'position': 'fixed',
-    'top': '0',
-    'left': '0',
-    'backgroundColor': colors['sidebar'],
-    'paddingTop': '15px',
-    'paddingBottom': '15px',
-    'paddingLeft': '15px',
-    'paddingRight': '15px',
-    'display': 'flex',
-    'flexDirection': 'column',
-    'overflowY': 'auto'
-})
 
 header = dbc.Row([
     dbc.Col([
@@ -321,782 +360,59 @@ header = dbc.Row([
     ], width=4)
 ], className="mb-2 mt-2")
 
-kpi_cards = dbc.Row([
-    # Total Sales Card
-    dbc.Col([
-        dbc.Card([
-            dbc.CardBody([
-                html.Div([
-                    html.I(className="fas fa-mug-hot", style={
-                        'fontSize': '18px',
-                        'color': colors['accent1'],
-                        'marginRight': '8px'
-                    }),
-                    html.Div([
-                        html.H6("Total Sales", style={'fontSize': '10px', 'margin': '0', 'color': '#666'}),
-                        html.H4(
-                            f"{sales_data['Total'].sum():,}",
-                            id="total-sales-value",
-                            style={'fontWeight': 'bold', 'color': colors['text'], 'margin': '0', 'fontSize': '16px'}
-                        )
-                    ])
-                ], style={'display': 'flex', 'alignItems': 'center'})
-            ], style={'padding': '8px'})  # Reduced padding
-        ], style=card_style)
-    ], width=3),
-
-    # Average Yearly Sales
-    dbc.Col([
-        dbc.Card([
-            dbc.CardBody([
-                html.Div([
-                    html.I(className="fas fa-chart-line", style={
-                        'fontSize': '18px',
-                        'color': colors['accent1'],
-                        'marginRight': '8px'
-                    }),
-                    html.Div([
-                        html.H6("Yearly Average", style={'fontSize': '10px', 'margin': '0', 'color': '#666'}),
-                        html.H4(
-                            f"{int(sales_data['Total'].mean()):,}",
-                            id="yearly-avg-value",
-                            style={'fontWeight': 'bold', 'color': colors['text'], 'margin': '0', 'fontSize': '16px'}
-                        )
-                    ])
-                ], style={'display': 'flex', 'alignItems': 'center'})
-            ], style={'padding': '8px'})
-        ], style=card_style)
-    ], width=3),
-
-    # Revenue
-    dbc.Col([
-        dbc.Card([
-            dbc.CardBody([
-                html.Div([
-                    html.I(className="fa-solid fa-peso-sign", style={
-                        'fontSize': '18px',
-                        'color': colors['accent1'],
-                        'marginRight': '8px'
-                    }),
-                    html.Div([
-                        html.H6("Total Revenue", style={'fontSize': '10px', 'margin': '0', 'color': '#666'}),
-                        html.H4(
-                            f"₱{sales_data['Revenue'].sum():,.2f}",
-                            id="revenue-value",
-                            style={'fontWeight': 'bold', 'color': colors['text'], 'margin': '0', 'fontSize': '16px'}
-                        )
-                    ])
-                ], style={'display': 'flex', 'alignItems': 'center'})
-            ], style={'padding': '8px'})
-        ], style=card_style)
-    ], width=3),
-
-    # Top Product
-    dbc.Col([
-        dbc.Card([
-            dbc.CardBody([
-                html.Div([
-                    html.I(className="fas fa-trophy", style={
-                        'fontSize': '18px',
-                        'color': colors['accent1'],
-                        'marginRight': '8px'
-                    }),
-                    html.Div([
-                        html.H6("Top Product", style={'fontSize': '10px', 'margin': '0', 'color': '#666'}),
-                        html.H4(
-                            top_product,
-                            id="top-product-value",
-                            style={'fontWeight': 'bold', 'color': coffee_colors[top_product], 'margin': '0',
-                                   'fontSize': '16px'}
-                        )
-                    ])
-                ], style={'display': 'flex', 'alignItems': 'center'})
-            ], style={'padding': '8px'})
-        ], style=card_style)
-    ], width=3),
-], className="mb-2")
-
-dashboard_view = dbc.Row([
-    # Left column with charts
-    dbc.Col([
-        # Sales trend chart
-        dbc.Card([
-            dbc.CardBody([
-                html.H6("Coffee Sales Trend (2014-2025)",
-                        style={'fontSize': '12px', 'margin': '0 0 5px 0', 'fontWeight': 'bold'}),
-                dcc.Graph(
-                    id="sales-trend-chart",
-                    figure=px.line(
-                        sales_long,
-                        x='Year',
-                        y='Sales',
-                        color='Coffee Type',
-                        color_discrete_map=coffee_colors,
-                        markers=True,
-                    ).update_layout(
-                        plot_bgcolor=colors['card_bg'],
-                        paper_bgcolor=colors['card_bg'],
-                        font=dict(color=colors['text'], size=9),
-                        margin=dict(l=5, r=5, t=5, b=5),
-                        legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="right", x=1, font=dict(size=8)),
-                        xaxis=dict(tickmode='array', tickvals=years, tickfont=dict(size=8)),
-                        yaxis=dict(tickfont=dict(size=8)),
-                        height=150,
-                        hovermode="x unified"
-                    ).update_traces(
-                        line=dict(width=2),
-                        marker=dict(size=4),
-                        hovertemplate='%{y:,.0f} cups'
-                    ),
-                    config={'displayModeBar': False, 'responsive': True},
-                    style={'height': '150px'}
-                )
-            ], style={'padding': '8px'})
-        ], style=card_style),
-
-        # Heatmap - more compact
-        dbc.Card([
-            dbc.CardBody([
-                html.H6("Coffee Sales by Day & Hour",
-                        style={'fontSize': '12px', 'margin': '0 0 5px 0', 'fontWeight': 'bold'}),
-                dcc.Graph(
-                    id="heatmap-chart",
-                    figure=px.imshow(
-                        np.outer(
-                            np.array([0.7, 0.6, 0.7, 0.8, 0.9, 1.3, 1.2]),
-                            np.array([1.4, 1.6, 1.2, 1.3, 0.8, 0.9, 1.0])
-                        ) * np.random.uniform(0.8, 1.2, size=(7, 7)),
-                        x=['7AM', '9AM', '11AM', '1PM', '3PM', '5PM', '7PM'],
-                        y=['Mon', 'Tue', 'Wed', 'Thu', 'Fri', 'Sat', 'Sun'],
-                        color_continuous_scale=[colors['card_bg'], colors['latte'], colors['cappuccino'],
-                                               colors['espresso']]
-                    ).update_layout(
-                        plot_bgcolor=colors['card_bg'],
-                        paper_bgcolor=colors['card_bg'],
-                        font=dict(color=colors['text'], size=9),
-                        margin=dict(l=5, r=5, t=5, b=5),
-                        height=130,
-                        coloraxis_showscale=True,
-                        coloraxis_colorbar=dict(
-                            title=dict(text=""),
-                            thicknessmode="pixels", thickness=8,
-                            lenmode="pixels", len=100,
-                            tickfont=dict(size=7)
-                        ),
-                        xaxis=dict(tickfont=dict(size=7)),
-                        yaxis=dict(tickfont=dict(size=7))
-                    ),
-                    config={'displayModeBar': False, 'responsive': True},
-                    style={'height': '130px'}
-                )
-            ], style={'padding': '8px'})
-        ], style=card_style),
-    ], width=7),
-
-    # Right column with charts
-    dbc.Col([
-        # Donut chart - more compact
-        dbc.Card([
-            dbc.CardBody([
-                html.H6("Share by Coffee Type",
-                        style={'fontSize': '12px', 'margin': '0 0 5px 0', 'fontWeight': 'bold'}),
-                dcc.Graph(
-                    id="share-pie-chart",
-                    figure=px.pie(
-                        pd.DataFrame(total_by_coffee),
-                        values='Sales',
-                        names='Type',
-                        hole=0.6,
-                        color='Type',
-                        color_discrete_map=coffee_colors
-                    ).update_layout(
-                        plot_bgcolor=colors['card_bg'],
-                        paper_bgcolor=colors['card_bg'],
-                        font=dict(color=colors['text'], size=9),
-                        margin=dict(l=5, r=5, t=5, b=5),
-                        legend=dict(orientation="h", yanchor="bottom", y=-0.1, font=dict(size=8)),
-                        annotations=[dict(
-                            text=f"{sum(total_by_coffee['Sales']):,}",
-                            showarrow=False,
-                            font=dict(size=14)
-                        )],
-                        height=145
-                    ).update_traces(
-                        textposition='inside',
-                        textinfo='percent',
-                        textfont=dict(size=9),
-                        hovertemplate='%{label}<br>%{value:,.0f} cups<br>%{percent}'
-                    ),
-                    config={'displayModeBar': False, 'responsive': True},
-                    style={'height': '145px'}
-                )
-            ], style={'padding': '8px'})
-        ], style=card_style),
-
-        # Bar chart - more compact
-        dbc.Card([
-            dbc.CardBody([
-                html.H6("Yearly Sales by Coffee Type",
-                        style={'fontSize': '12px', 'margin': '0 0 5px 0', 'fontWeight': 'bold'}),
-                dcc.Graph(
-                    id="yearly-bar-chart",
-                    figure=px.bar(
-                        sales_long,
-                        x='Year',
-                        y='Sales',
-                        color='Coffee Type',
-                        barmode='group',
-                        color_discrete_map=coffee_colors,
-                    ).update_layout(
-                        plot_bgcolor=colors['card_bg'],
-                        paper_bgcolor=colors['card_bg'],
-                        font=dict(color=colors['text'], size=9),
-                        margin=dict(l=5, r=5, t=5, b=5),
-                        legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="right", x=1, font=dict(size=8)),
-                        xaxis=dict(tickfont=dict(size=7)),
-                        yaxis=dict(tickfont=dict(size=7)),
-                        height=130,
-                        bargap=0.15,
-                        bargroupgap=0.05
-                    ).update_traces(
-                        hovertemplate='%{y:,.0f} cups'
-                    ),
-                    config={'displayModeBar': False, 'responsive': True},
-                    style={'height': '130px'}
-                )
-            ], style={'padding': '8px'})
-        ], style=card_style)
-    ], width=5)
-], className="mb-1")
-
-trends_view = dbc.Row([
-    # Left column
-    dbc.Col([
-        # Price trends chart
-        dbc.Card([
-            dbc.CardBody([
-                html.H6("Coffee Price Trends (2014-2025)", style={'fontSize': '12px', 'margin': '0 0 5px 0', 'fontWeight': 'bold'}),
-                dcc.Graph(
-                    id="price-trend-chart",
-                    figure=px.line(
-                        price_long,
-                        x='Year',
-                        y='Price',
-                        color='Coffee Type',
-                        color_discrete_map=coffee_colors,
-                        markers=True,
-                    ).update_layout(
-                        plot_bgcolor=colors['card_bg'],
-                        paper_bgcolor=colors['card_bg'],
-                        font=dict(color=colors['text'], size=9),
-                        margin=dict(l=5, r=5, t=5, b=5),
-                        legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="right", x=1, font=dict(size=8)),
-                        xaxis=dict(tickmode='array', tickvals=years, tickfont=dict(size=8)),
-                        yaxis=dict(tickfont=dict(size=8), tickprefix='₱'),
-                        height=150,
-                        hovermode="x unified"
-                    ).update_traces(
-                        line=dict(width=2),
-                        marker=dict(size=4),
-                        hovertemplate='₱%{y:.2f}'
-                    ),
-                    config={'displayModeBar': False, 'responsive': True},
-                    style={'height': '150px'}
-                )
-            ], style={'padding': '8px'})
-        ], style=card_style),
-
-        # Sales vs Price correlation
-        dbc.Card([
-            dbc.CardBody([
-                html.H6("Sales vs Price Correlation",
-                        style={'fontSize': '12px', 'margin': '0 0 5px 0', 'fontWeight': 'bold'}),
-                dcc.Graph(
-                    id="correlation-chart",
-                    figure=px.scatter(
-                        x=[3.2, 3.3, 3.4, 3.5, 3.6, 3.7, 3.8],
-                        y=[1100, 1050, 1000, 970, 930, 880, 850],
-                        color_discrete_sequence=[colors['espresso']],
-                        labels={"x": "Price (₱)", "y": "Sales (cups)"}
-                    ).update_layout(
-                        plot_bgcolor=colors['card_bg'],
-                        paper_bgcolor=colors['card_bg'],
-                        font=dict(color=colors['text'], size=9),
-                        margin=dict(l=5, r=5, t=5, b=5),
-                        xaxis=dict(tickfont=dict(size=8), tickprefix='₱'),
-                        yaxis=dict(tickfont=dict(size=8)),
-                        height=130,
-                        showlegend=False
-                    ).add_shape(
-                        type="line",
-                        x0=3.2, y0=1100,
-                        x1=3.8, y1=850,
-                        line=dict(color=colors['espresso'], width=2)
-                    ).add_annotation(
-                        x=4.5, y=970,
-                        text="Price Elasticity: -1.2",
-                        showarrow=False,
-                        font=dict(size=9)
-                    ),
-                    config={'displayModeBar': False, 'responsive': True},
-                    style={'height': '130px'}
-                )
-            ], style={'padding': '8px'})
-        ], style=card_style),
-    ], width=6),
-
-    # Right column
-    dbc.Col([
-        # Trend pattern by period
-        dbc.Card([
-            dbc.CardBody([
-                html.H6("Sales Trend by Period",
-                        style={'fontSize': '12px', 'margin': '0 0 5px 0', 'fontWeight': 'bold'}),
-                dcc.Graph(
-                    id="seasonal-chart",
-                    figure=px.bar(
-                        pd.DataFrame({
-                            'Period': ['2014-2016', '2017-2019', '2020-2022', '2023-2025'],
-                            'Espresso': [3050, 3280, 3520, 3750],
-                            'Latte': [4550, 4780, 5100, 5400],
-                            'Cappuccino': [3650, 3800, 3950, 4180]
-                        }).melt(
-                            id_vars=['Period'],
-                            value_vars=['Espresso', 'Latte', 'Cappuccino'],
-                            var_name='Coffee Type',
-                            value_name='Sales'
-                        ),
-                        x='Period',
-                        y='Sales',
-                        color='Coffee Type',
-                        barmode='group',
-                        color_discrete_map=coffee_colors
-                    ).update_layout(
-                        plot_bgcolor=colors['card_bg'],
-                        paper_bgcolor=colors['card_bg'],
-                        font=dict(color=colors['text'], size=9),
-                        margin=dict(l=5, r=5, t=5, b=5),
-                        legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="right", x=1, font=dict(size=8)),
-                        xaxis=dict(tickfont=dict(size=8)),
-                        yaxis=dict(tickfont=dict(size=8)),
-                        height=150,
-                        bargap=0.15,
-                        bargroupgap=0.05
-                    ),
-                    config={'displayModeBar': False, 'responsive': True},
-                    style={'height': '150px'}
-                )
-            ], style={'padding': '8px'})
-        ], style=card_style),
-
-        # Customer demographic chart
-        dbc.Card([
-            dbc.CardBody([
-                html.H6("Customer Demographics",
-                        style={'fontSize': '12px', 'margin': '0 0 5px 0', 'fontWeight': 'bold'}),
-                dcc.Graph(
-                    id="demographic-chart",
-                    figure=px.pie(
-                        pd.DataFrame({
-                            'Age Group': ['18-25', '26-35', '36-45', '46-55', '56+'],
-                            'Percentage': [15, 35, 25, 15, 10]
-                        }),
-                        values='Percentage',
-                        names='Age Group',
-                        hole=0.4,
-                        color_discrete_sequence=[colors['espresso'], colors['latte'], colors['cappuccino'],
-                                               '#A67B5B', '#8B7355']
-                    ).update_layout(
-                        plot_bgcolor=colors['card_bg'],
-                        paper_bgcolor=colors['card_bg'],
-                        font=dict(color=colors['text'], size=9),
-                        margin=dict(l=5, r=5, t=5, b=5),
-                        legend=dict(orientation="h", yanchor="bottom", y=-0.1, font=dict(size=8)),
-                        height=130
-                    ).update_traces(
-                        textposition='inside',
-                        textinfo='percent',
-                        hovertemplate='%{label}<br>%{percent}'
-                    ),
-                    config={'displayModeBar': False, 'responsive': True},
-                    style={'height': '130px'}
-                )
-            ], style={'padding': '8px'})
-        ], style=card_style)
-    ], width=6)
-], className="mb-1")
-
-predictions_view = dbc.Row([
-    # Left column
-    dbc.Col([
-        # Sales predictions chart
-        dbc.Card([
-            dbc.CardBody([
-                html.H6("Sales Forecast (2026-2029)",
-                        style={'fontSize': '12px', 'margin': '0 0 5px 0', 'fontWeight': 'bold'}),
-                dcc.Graph(
-                    id="predictions-chart",
-                    figure=go.Figure()
-                    .add_trace(go.Scatter(
-                        x=prediction_years[:12],
-                        y=espresso_predictions[:12],
-                        mode='lines+markers',
-                        name='Espresso',
-                        line=dict(color=colors['espresso'], width=2)
-                    ))
-                    .add_trace(go.Scatter(
-                        x=prediction_years[11:],
-                        y=espresso_predictions[11:],
-                        mode='lines+markers',
-                        name='Espresso Forecast',
-                        line=dict(color=colors['espresso'], width=2, dash='dot')
-                    ))
-                    .add_trace(go.Scatter(
-                        x=prediction_years[:12],
-                        y=latte_predictions[:12],
-                        mode='lines+markers',
-                        name='Latte',
-                        line=dict(color=colors['latte'], width=2)
-                    ))
-                    .add_trace(go.Scatter(
-                        x=prediction_years[11:],
-                        y=latte_predictions[11:],
-                        mode='lines+markers',
-                        name='Latte Forecast',
-                        line=dict(color=colors['latte'], width=2, dash='dot')
-                    ))
-                    .add_trace(go.Scatter(
-                        x=prediction_years[:12],
-                        y=cappuccino_predictions[:12],
-                        mode='lines+markers',
-                        name='Cappuccino',
-                        line=dict(color=colors['cappuccino'], width=2)
-                    ))
-                    .add_trace(go.Scatter(
-                        x=prediction_years[11:],
-                        y=cappuccino_predictions[11:],
-                        mode='lines+markers',
-                        name='Cappuccino Forecast',
-                        line=dict(color=colors['cappuccino'], width=2, dash='dot')
-                    ))
-                    .update_layout(
-                        plot_bgcolor=colors['card_bg'],
-                        paper_bgcolor=colors['card_bg'],
-                        font=dict(color=colors['text'], size=9),
-                        margin=dict(l=5, r=5, t=5, b=5),
-                        legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="right", x=1, font=dict(size=8)),
-                        xaxis=dict(tickfont=dict(size=8)),
-                        yaxis=dict(tickfont=dict(size=8)),
-                        height=150,
-                        hovermode="x unified",
-                        shapes=[{
-                            'type': 'line',
-                            'x0': years[-1],
-                            'y0': 0,
-                            'x1': years[-1],
-                            'y1': 2000,
-                            'line': {
-                                'color': 'gray',
-                                'width': 1,
-                                'dash': 'dot',
-                            }
-                        }],
-                        annotations=[{
-                            'x': years[-1],
-                            'y': 2000,
-                            'text': 'Forecast Starts',
-                            'showarrow': False,
-                            'font': {'size': 8},
-                            'xanchor': 'left',
-                            'yanchor': 'top'
-                        }]
-                    ),
-                    config={'displayModeBar': False, 'responsive': True},
-                    style={'height': '150px'}
-                )
-            ], style={'padding': '8px'})
-        ], style=card_style),
-
-        # Predicted revenue
-        dbc.Card([
-            dbc.CardBody([
-                html.H6("Forecasted Revenue Growth",
-                        style={'fontSize': '12px', 'margin': '0 0 5px 0', 'fontWeight': 'bold'}),
-                html.Div([
-                    dbc.Row([
-                        dbc.Col([
-                            html.Div([
-                                html.H5("₱147,862,000", style={'fontSize': '14px', 'fontWeight': 'bold', 'margin': '0',
-                                                           'color': colors['text']}),
-                                html.P("Current Total (2014-2025)", style={'fontSize': '9px', 'margin': '0', 'color': '#777'})
-                            ], style={'textAlign': 'center'})
-                        ], width=4),
-                        dbc.Col([
-                            html.Div([
-                                html.H5("₱156,435,000", style={'fontSize': '14px', 'fontWeight': 'bold', 'margin': '0',
-                                                           'color': colors['success']}),
-                                html.P("Forecasted Total (2026-2029)", style={'fontSize': '9px', 'margin': '0', 'color': '#777'})
-                            ], style={'textAlign': 'center'})
-                        ], width=4),
-                        dbc.Col([
-                            html.Div([
-                                html.H5("+5.8%", style={'fontSize': '14px', 'fontWeight': 'bold', 'margin': '0',
-                                                        'color': colors['success']}),
-                                html.P("Growth Rate", style={'fontSize': '9px', 'margin': '0', 'color': '#777'})
-                            ], style={'textAlign': 'center'})
-                        ], width=4)
-                    ], className="mb-2"),
-
-                    dcc.Graph(
-                        figure=go.Figure().add_trace(
-                            go.Indicator(
-                                mode="gauge+number",
-                                value=5.8,
-                                title={'text': "Growth", 'font': {'size': 10}},
-                                gauge={
-                                    'axis': {'range': [0, 10], 'tickwidth': 1, 'tickfont': {'size': 8}},
-                                    'bar': {'color': colors['success']},
-                                    'steps': [
-                                        {'range': [0, 3], 'color': '#EBE3D5'},
-                                        {'range': [3, 7], 'color': '#D2B48C'},
-                                        {'range': [7, 10], 'color': '#8B4513'}
-                                    ],
-                                    'threshold': {
-                                        'line': {'color': colors['accent2'], 'width': 2},
-                                        'thickness': 0.8,
-                                        'value': 5.8
-                                    }
-                                }
-                            )
-                        ).update_layout(
-                            height=90,
-                            margin=dict(l=5, r=5, t=5, b=5),
-                            paper_bgcolor=colors['card_bg'],
-                            font=dict(color=colors['text'], size=9)
-                        ),
-                        config={'displayModeBar': False, 'responsive': True},
-                        style={'height': '120px'}
-                    )
-                ])
-            ], style={'padding': '8px'})
-        ], style=card_style)
-    ], width=7),
-
-    # Right column
-    dbc.Col([
-        # Recommendations
-        dbc.Card([
-            dbc.CardBody([
-                html.H6("AI Recommendations", style={'fontSize': '12px', 'margin': '0 0 8px 0', 'fontWeight': 'bold'}),
-                html.Div([
-                    html.Div([
-                        html.I(className="fas fa-lightbulb mr-2", style={'color': colors['warning']}),
-                        html.Span("Increase marketing focus on premium Latte variants", style={'fontSize': '11px'})
-                    ], className="mb-2", style={'display': 'flex', 'alignItems': 'center', 'gap': '8px'}),
-                    html.Div([
-                        html.I(className="fas fa-chart-line mr-2", style={'color': colors['info']}),
-                        html.Span("Espresso shows strongest long-term growth potential", style={'fontSize': '11px'})
-                    ], className="mb-2", style={'display': 'flex', 'alignItems': 'center', 'gap': '8px'}),
-                    html.Div([
-                        html.I(className="fas fa-tag mr-2", style={'color': colors['success']}),
-                        html.Span("Consider 5% annual price increases for Cappuccino", style={'fontSize': '11px'})
-                    ], className="mb-2", style={'display': 'flex', 'alignItems': 'center', 'gap': '8px'}),
-                    html.Div([
-                        html.I(className="fas fa-clock mr-2", style={'color': colors['accent2']}),
-                        html.Span("Expand store locations based on decade growth pattern", style={'fontSize': '11px'})
-                    ], style={'display': 'flex', 'alignItems': 'center', 'gap': '8px'}),
-                ], style={'marginBottom': '10px'}),
-                dbc.Button("Generate New Insights",
-                           color="light",
-                           size="sm",
-                           style={
-                               'backgroundColor': colors['sidebar'],
-                               'borderColor': colors['accent1'],
-                               'color': colors['text'],
-                               'fontSize': '10px',
-                               'width': '100%'
-                           })
-            ], style={'padding': '10px'})
-        ], style=card_style),
-
-        # Price optimization
-        dbc.Card([
-            dbc.CardBody([
-                html.H6("Long-term Price Optimization", style={'fontSize': '12px', 'margin': '0 0 8px 0', 'fontWeight': 'bold'}),
-                html.Div([
-                    html.Table([
-                        html.Thead([
-                            html.Tr([
-                                html.Th("Product",
-                                        style={'fontSize': '10px', 'textAlign': 'left', 'paddingRight': '8px',
-                                               'paddingBottom': '6px'}),
-                                html.Th("2025 Price",
-                                        style={'fontSize': '10px', 'textAlign': 'right', 'paddingRight': '8px',
-                                               'paddingBottom': '6px'}),
-                                html.Th("2030 Target",
-                                        style={'fontSize': '10px', 'textAlign': 'right', 'paddingRight': '8px',
-                                               'paddingBottom': '6px'}),
-                                html.Th("∆ Revenue",
-                                        style={'fontSize': '10px', 'textAlign': 'right', 'paddingBottom': '6px'})
-                            ], style={'borderBottom': '1px solid #ddd'})
-                        ]),
-                        html.Tbody([
-                            html.Tr([
-                                html.Td([
-                                    html.Div(style={'width': '8px', 'height': '8px', 'borderRadius': '50%',
-                                                    'backgroundColor': colors['espresso'], 'display': 'inline-block',
-                                                    'marginRight': '5px'}),
-                                    "Espresso"
-                                ], style={'fontSize': '10px', 'whiteSpace': 'nowrap', 'padding': '8px 0'}),
-                                html.Td("₱3.75", style={'fontSize': '10px', 'textAlign': 'right', 'padding': '8px 0'}),
-                                html.Td("₱4.25",
-                                        style={'fontSize': '10px', 'textAlign': 'right', 'color': colors['success'],
-                                               'padding': '8px 0'}),
-                                html.Td("+14.2%",
-                                        style={'fontSize': '10px', 'textAlign': 'right', 'color': colors['success'],
-                                               'padding': '8px 0'})
-                            ], style={'borderBottom': '1px solid #f5f5f5'}),
-                            html.Tr([
-                                html.Td([
-                                    html.Div(style={'width': '8px', 'height': '8px', 'borderRadius': '50%',
-                                                    'backgroundColor': colors['latte'], 'display': 'inline-block',
-                                                    'marginRight': '5px'}),
-                                    "Latte"
-                                ], style={'fontSize': '10px', 'whiteSpace': 'nowrap', 'padding': '8px 0'}),
-                                html.Td("₱4.80", style={'fontSize': '10px', 'textAlign': 'right', 'padding': '8px 0'}),
-                                html.Td("₱5.50", style={'fontSize': '10px', 'textAlign': 'right', 'color': colors['success'], 'padding': '8px 0'}),
-                                html.Td("+18.5%", style={'fontSize': '10px', 'textAlign': 'right', 'color': colors['success'], 'padding': '8px 0'})
-                            ], style={'borderBottom': '1px solid #f5f5f5'}),
-                            html.Tr([
-                                html.Td([
-                                    html.Div(style={'width': '8px', 'height': '8px', 'borderRadius': '50%',
-                                                    'backgroundColor': colors['cappuccino'], 'display': 'inline-block',
-                                                    'marginRight': '5px'}),
-                                    "Cappuccino"
-                                ], style={'fontSize': '10px', 'whiteSpace': 'nowrap', 'padding': '8px 0'}),
-                                html.Td("₱4.50", style={'fontSize': '10px', 'textAlign': 'right', 'padding': '8px 0'}),
-                                html.Td("₱5.10",
-                                        style={'fontSize': '10px', 'textAlign': 'right', 'color': colors['success'],
-                                               'padding': '8px 0'}),
-                                html.Td("+16.8%",
-                                        style={'fontSize': '10px', 'textAlign': 'right', 'color': colors['success'],
-                                               'padding': '8px 0'})
-                            ], style={'borderBottom': '1px solid #f5f5f5'})
-                        ])
-                    ], style={'width': '100%'}),
-
-                    # Add more space and extra content
-                    html.Div([
-                        html.Hr(style={'margin': '15px 0 10px 0', 'opacity': '0.3'}),
-                        html.Div([
-                            html.Small("Suggested price changes for 2026-2030 period",
-                                       style={'fontSize': '9px', 'fontStyle': 'italic', 'color': '#777',
-                                              'marginBottom': '5px'}),
-                        ], style={'textAlign': 'center'}),
-                        html.Div([
-                            html.Small([
-                                html.I(className="fas fa-info-circle mr-1",
-                                       style={'color': colors['accent1'], 'marginRight': '4px'}),
-                                f"Last updated: 2025-03-12 04:52:00 by wxdove"
-                            ], style={'fontSize': '8px', 'color': '#999', 'display': 'block', 'textAlign': 'center',
-                                      'marginTop': '10px'})
-                        ])
-                    ])
-                ], style={'minHeight': '100px'})
-            ], style={'padding': '10px'})
-        ], style=dict(card_style, **{'height': 'calc(50%)'}))
-    ], width=5)
-], className="mb-1")
-
-active_view_store = dcc.Store(id='active-view-store', data='dashboard')
-
-active_filter_store = dcc.Store(id='active-filter-store', data='all')
-
-content_area = html.Div([
-    active_view_store,
-    active_filter_store,
-    kpi_cards,
-    html.Div(id='view-content', children=[dashboard_view])
-], style={
-    'marginLeft': '150px',  # Make room for the sidebar
-    'padding': '10px',
-    'height': '100vh',
-    'overflowY': 'auto'
-})
-
-app.layout = html.Div([
-    sidebar,
-    html.Div([
-        header,
-        content_area
-    ], style={'width': 'calc(100% - 220px)', 'float': 'right'})
-], style={
-    'backgroundColor': colors['background'],
-    'fontFamily': '"Raleway", sans-serif',
-    'height': '100vh',
-    'overflowX': 'hidden'
-})
-
-
-def filter_data(coffee_filter):
+def filter_data(data, coffee_filter):
     """Filter data based on the filter status"""
+    coffee_filter = data.cube.resolve(coffee_filter)
+    summary = data.cube.summary(coffee_filter)
+
     if coffee_filter == 'all':
-        filtered_sales = sales_long
-        total_sales = sales_data['Total'].sum()
-        yearly_avg = int(sales_data['Total'].mean())
-        total_revenue = sales_data['Revenue'].sum()
-        top_coffee = top_product
-        pie_data = pd.DataFrame(total_by_coffee)
         heatmap_colors = [colors['card_bg'], colors['latte'], colors['cappuccino'], colors['espresso']]
-    elif coffee_filter == 'Espresso':
-        filtered_sales = sales_long[sales_long['Coffee Type'] == 'Espresso']
-        total_sales = sales_data['Espresso'].sum()
-        yearly_avg = int(sales_data['Espresso'].mean())
-        total_revenue = (sales_data['Espresso'] * sales_data['EspressoPrice']).sum()
-        top_coffee = 'Espresso'
-        pie_data = pd.DataFrame({'Type': ['Espresso'], 'Sales': [total_sales]})
-        heatmap_colors = [colors['card_bg'], colors['espresso']]
-    elif coffee_filter == 'Latte':
-        filtered_sales = sales_long[sales_long['Coffee Type'] == 'Latte']
-        total_sales = sales_data['Latte'].sum()
-        yearly_avg = int(sales_data['Latte'].mean())
-        total_revenue = (sales_data['Latte'] * sales_data['LattePrice']).sum()
-        top_coffee = 'Latte'
-        pie_data = pd.DataFrame({'Type': ['Latte'], 'Sales': [total_sales]})
-        heatmap_colors = [colors['card_bg'], colors['latte']]
-    elif coffee_filter == 'Cappuccino':
-        filtered_sales = sales_long[sales_long['Coffee Type'] == 'Cappuccino']
-        total_sales = sales_data['Cappuccino'].sum()
-        yearly_avg = int(sales_data['Cappuccino'].mean())
-        total_revenue = (sales_data['Cappuccino'] * sales_data['CappuccinoPrice']).sum()
-        top_coffee = 'Cappuccino'
-        pie_data = pd.DataFrame({'Type': ['Cappuccino'], 'Sales': [total_sales]})
-        heatmap_colors = [colors['card_bg'], colors['cappuccino']]
     else:
-        # Default case
-        filtered_sales = sales_long
-        total_sales = sales_data['Total'].sum()
-        yearly_avg = int(sales_data['Total'].mean())
-        total_revenue = sales_data['Revenue'].sum()
-        top_coffee = top_product
-        pie_data = pd.DataFrame(total_by_coffee)
-        heatmap_colors = [colors['card_bg'], colors['latte'], colors['cappuccino'], colors['espresso']]
+        heatmap_colors = [colors['card_bg'], data.catalog.colors[coffee_filter]]
+
+    return dict(
+        summary,
+        heatmap_colors=heatmap_colors,
+        top_color=data.catalog.colors.get(summary['top_coffee'], colors['text'])
+    )
 
+def filter_aggregates(data):
+    """What the clientside filter needs: product names and slugs in sidebar order, and per filter the KPI texts
+    and the contents of the cards that do not consist of per-product traces"""
+    kpis = {}
+    for coffee_filter in ['all'] + data.catalog.names:
+        summary = data.cube.summary(coffee_filter)
+        kpis[coffee_filter] = {
+            'total_sales': f"{summary['total_sales']:,}",
+            'yearly_avg': f"{summary['yearly_avg']:,}",
+            'total_revenue': f"₱{summary['total_revenue']:,.2f}",
+            'top_coffee': summary['top_coffee'],
+            'top_color': data.catalog.colors.get(summary['top_coffee'], colors['text'])
+        }
+    filters = ['all'] + data.catalog.names
+    correlations = {}
+    for coffee_filter in filters:
+        correlation = price_correlation(data, coffee_filter)
+        correlations[coffee_filter] = dict(correlation, x=correlation['x'].tolist(), y=correlation['y'].tolist())
     return {
-        'filtered_sales': filtered_sales,
-        'total_sales': total_sales,
-        'yearly_avg': yearly_avg,
-        'total_revenue': total_revenue,
-        'top_coffee': top_coffee,
-        'pie_data': pie_data,
-        'heatmap_colors': heatmap_colors
+        'names': data.catalog.names,
+        'slugs': [product.slug for product in data.catalog],
+        'kpis': kpis,
+        # Cards of the trends and predictions views that are not made of per-product traces
+        'correlation': correlations,
+        'growth': {coffee_filter: growth_summary(data, coffee_filter) for coffee_filter in filters},
+        'recommendations': {coffee_filter: recommendation_texts(data, coffee_filter) for coffee_filter in filters},
+        'price_rows': {coffee_filter: [product.slug for product in price_table_products(data, coffee_filter)]
+                       for coffee_filter in filters}
     }
 
+
 def create_kpi_cards(filtered_data):
     total_sales = filtered_data['total_sales']
     yearly_avg = filtered_data['yearly_avg']
     total_revenue = filtered_data['total_revenue']
     top_coffee = filtered_data['top_coffee']
+    top_color = filtered_data['top_color']
 
     return dbc.Row([
         # Total Sales Card
@@ -1183,7 +499,7 @@ def create_kpi_cards(filtered_data):
                             html.H4(
                                 top_coffee,
                                 id="top-product-value",
-                                style={'fontWeight': 'bold', 'color': coffee_colors.get(top_coffee, colors['text']),
+                                style={'fontWeight': 'bold', 'color': top_color,
                                        'margin': '0',
                                        'fontSize': '16px'}
                             )
@@ -1195,45 +511,36 @@ def create_kpi_cards(filtered_data):
     ], className="mb-2")
 
 
-def generate_dashboard_view(coffee_filter):
+def generate_dashboard_view(data, coffee_filter):
+    years, coffee_colors = data.years, data.catalog.colors
     # Get filtered data
-    filtered_data = filter_data(coffee_filter)
-    filtered_sales = filtered_data['filtered_sales']
+    filtered_data = filter_data(data, coffee_filter)
     pie_data = filtered_data['pie_data']
     heatmap_colors = filtered_data['heatmap_colors']
     total_sales = filtered_data['total_sales']
+    units, products = data.cube.series(coffee_filter)
+    units = units.astype('int64')
 
     # Create KPI cards
     kpi_cards_updated = create_kpi_cards(filtered_data)
 
     # Generate charts
-    line_fig = px.line(
-        filtered_sales, x='Year', y='Sales', color='Coffee Type',
-        color_discrete_map=coffee_colors, markers=True
-    ).update_layout(
-        plot_bgcolor=colors['card_bg'],
-        paper_bgcolor=colors['card_bg'],
-        font=dict(color=colors['text'], size=9),
-        margin=dict(l=5, r=5, t=5, b=5),
+    line_fig = figures.figure(
+        figures.lines(years, units, products, coffee_colors, hovertemplate='%{y:,.0f} cups'),
         legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="right", x=1, font=dict(size=8)),
         xaxis=dict(tickmode='array', tickvals=years, tickfont=dict(size=8)),
-        yaxis=dict(tickfont=dict(size=8)),
         height=150,
         hovermode="x unified"
-    ).update_traces(
-        line=dict(width=2),
-        marker=dict(size=4),
-        hovertemplate='%{y:,.0f} cups'
     )
 
-    pie_fig = px.pie(
-        pie_data, values='Sales', names='Type', hole=0.6,
-        color='Type', color_discrete_map=coffee_colors
-    ).update_layout(
-        plot_bgcolor=colors['card_bg'],
-        paper_bgcolor=colors['card_bg'],
-        font=dict(color=colors['text'], size=9),
-        margin=dict(l=5, r=5, t=5, b=5),
+    pie_fig = figures.figure(
+        [figures.donut(
+            pie_data['Type'], pie_data['Sales'], colors=coffee_colors, hole=0.6,
+            textposition='inside',
+            textinfo='percent',
+            textfont=dict(size=9),
+            hovertemplate='%{label}<br>%{value:,.0f} cups<br>%{percent}'
+        )],
         legend=dict(
             orientation="v",
             yanchor="middle",
@@ -1244,51 +551,33 @@ def generate_dashboard_view(coffee_filter):
         ),
         annotations=[dict(text=f"{total_sales:,}", showarrow=False, font=dict(size=14))],
         height=165  # Increased height to accommodate the legend
-    ).update_traces(
-        textposition='inside',
-        textinfo='percent',
-        textfont=dict(size=9),
-        hovertemplate='%{label}<br>%{value:,.0f} cups<br>%{percent}'
     )
 
-    # Rest of the code remains the same...
-    bar_fig = px.bar(
-        filtered_sales, x='Year', y='Sales', color='Coffee Type',
-        barmode='group', color_discrete_map=coffee_colors,
-    ).update_layout(
-        plot_bgcolor=colors['card_bg'],
-        paper_bgcolor=colors['card_bg'],
-        font=dict(color=colors['text'], size=9),
-        margin=dict(l=5, r=5, t=5, b=5),
+    bar_fig = figures.figure(
+        figures.bars(years, units, products, coffee_colors, hovertemplate='%{y:,.0f} cups'),
         legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="right", x=1, font=dict(size=8)),
         xaxis=dict(tickfont=dict(size=7)),
         yaxis=dict(tickfont=dict(size=7)),
         height=130,
+        barmode='group',
         bargap=0.15,
         bargroupgap=0.05
-    ).update_traces(
-        hovertemplate='%{y:,.0f} cups'
     )
 
-    heatmap_fig = px.imshow(
+    heatmap_trace, heatmap_layout = figures.heatmap(
         np.outer(np.array([0.7, 0.6, 0.7, 0.8, 0.9, 1.3, 1.2]),
                  np.array([1.4, 1.6, 1.2, 1.3, 0.8, 0.9, 1.0])) * np.random.uniform(0.8, 1.2, size=(7, 7)),
         x=['7AM', '9AM', '11AM', '1PM', '3PM', '5PM', '7PM'],
         y=['Mon', 'Tue', 'Wed', 'Thu', 'Fri', 'Sat', 'Sun'],
-        color_continuous_scale=heatmap_colors
-    ).update_layout(
-        plot_bgcolor=colors['card_bg'],
-        paper_bgcolor=colors['card_bg'],
-        font=dict(color=colors['text'], size=9),
-        margin=dict(l=5, r=5, t=5, b=5),
-        height=130,
-        coloraxis_showscale=True,
-        coloraxis_colorbar=dict(
+        colorscale=heatmap_colors,
+        colorbar=dict(
             title=dict(text=""),
             thicknessmode="pixels", thickness=8,
             lenmode="pixels", len=100,
             tickfont=dict(size=7)
-        ),
+        )
+    )
+    heatmap_fig = figures.figure([heatmap_trace], height=130, **heatmap_layout).update_layout(
         xaxis=dict(tickfont=dict(size=7)),
         yaxis=dict(tickfont=dict(size=7))
     )
@@ -1298,7 +587,7 @@ def generate_dashboard_view(coffee_filter):
         dbc.Col([
             dbc.Card([
                 dbc.CardBody([
-                    html.H6("Coffee Sales Trend (2014-2025)",
+                    html.H6(f"Coffee Sales Trend ({years[0]}-{years[-1]})",
                             style={'fontSize': '12px', 'margin': '0 0 5px 0', 'fontWeight': 'bold'}),
                     dcc.Graph(
                         id="sales-trend-chart",
@@ -1356,117 +645,88 @@ def generate_dashboard_view(coffee_filter):
     return [kpi_cards_updated, dashboard_view_updated]
 
 
-def generate_trends_view(coffee_filter):
-    filtered_data = filter_data(coffee_filter)
+def price_correlation(data, coffee_filter):
+    """Points, least-squares line and elasticity label of the sales vs price chart"""
+    corr_x, corr_y = data.cube.price_response(coffee_filter)
+
+    # Point elasticity at the mean of a least-squares line through the yearly points
+    if len(corr_x) > 1 and np.ptp(corr_x) > 0:
+        slope, intercept = np.polyfit(corr_x, corr_y, 1)
+        elasticity = slope * corr_x.mean() / corr_y.mean()
+    else:
+        slope, intercept = 0.0, float(corr_y.mean()) if len(corr_y) else 0.0
+        elasticity = 0.0
+
+    labelled = max(len(corr_x) - 2, 0)
+    return {
+        'x': corr_x,
+        'y': corr_y,
+        'color': data.catalog.colors.get(coffee_filter, colors['espresso']),
+        'line': [float(corr_x[0]), float(slope * corr_x[0] + intercept),
+                 float(corr_x[-1]), float(slope * corr_x[-1] + intercept)],
+        'label': [float(corr_x[labelled]), float(corr_y[labelled])],
+        'text': f"Price Elasticity: {elasticity:.1f}"
+    }
+
+
+def generate_trends_view(data, coffee_filter):
+    years, coffee_colors = data.years, data.catalog.colors
+    filtered_data = filter_data(data, coffee_filter)
 
     kpi_cards_updated = create_kpi_cards(filtered_data)
 
-    if coffee_filter == 'all':
-        price_data = price_long
-    else:
-        price_data = price_long[price_long['Coffee Type'] == coffee_filter]
-
-    price_fig = px.line(
-        price_data, x='Year', y='Price', color='Coffee Type',
-        color_discrete_map=coffee_colors, markers=True,
-    ).update_layout(
-        plot_bgcolor=colors['card_bg'],
-        paper_bgcolor=colors['card_bg'],
-        font=dict(color=colors['text'], size=9),
-        margin=dict(l=5, r=5, t=5, b=5),
+    prices, products = data.cube.series(coffee_filter, PRICE)
+
+    price_fig = figures.figure(
+        figures.lines(years, prices, products, coffee_colors, hovertemplate='₱%{y:.2f}'),
         legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="right", x=1, font=dict(size=8)),
         xaxis=dict(tickmode='array', tickvals=years, tickfont=dict(size=8)),
         yaxis=dict(tickfont=dict(size=8), tickprefix='₱'),
         height=150,
         hovermode="x unified"
-    ).update_traces(
-        line=dict(width=2),
-        marker=dict(size=4),
-        hovertemplate='₱%{y:.2f}'
     )
 
-    period_data = pd.DataFrame({
-        'Period': ['2014-2016', '2017-2019', '2020-2022', '2023-2025']
-    })
+    period_labels, period_means, products = data.cube.period_means(coffee_filter)
 
-    if coffee_filter == 'all' or coffee_filter == 'Espresso':
-        period_data['Espresso'] = [3050, 3280, 3520, 3750]
-    if coffee_filter == 'all' or coffee_filter == 'Latte':
-        period_data['Latte'] = [4550, 4780, 5100, 5400]
-    if coffee_filter == 'all' or coffee_filter == 'Cappuccino':
-        period_data['Cappuccino'] = [3650, 3800, 3950, 4180]
-
-    period_long = pd.melt(
-        period_data,
-        id_vars=['Period'],
-        value_vars=[col for col in period_data.columns if col != 'Period'],
-        var_name='Coffee Type',
-        value_name='Sales'
-    )
-
-    period_fig = px.bar(
-        period_long,
-        x='Period',
-        y='Sales',
-        color='Coffee Type',
-        barmode='group',
-        color_discrete_map=coffee_colors
-    ).update_layout(
-        plot_bgcolor=colors['card_bg'],
-        paper_bgcolor=colors['card_bg'],
-        font=dict(color=colors['text'], size=9),
-        margin=dict(l=5, r=5, t=5, b=5),
+    period_fig = figures.figure(
+        figures.bars(period_labels, period_means, products, coffee_colors),
         legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="right", x=1, font=dict(size=8)),
-        xaxis=dict(tickfont=dict(size=8)),
-        yaxis=dict(tickfont=dict(size=8)),
         height=150,
+        barmode='group',
         bargap=0.15,
         bargroupgap=0.05
     )
 
-    corr_x = [3.2, 3.3, 3.4, 3.5, 3.6, 3.7, 3.8]
-    corr_y = [1100, 1050, 1000, 970, 930, 880, 850]
-
-    if coffee_filter == 'Latte':
-        corr_x = [4.2, 4.3, 4.4, 4.5, 4.6, 4.7, 4.8]
-        corr_y = [1600, 1550, 1500, 1470, 1430, 1380, 1350]
-    elif coffee_filter == 'Cappuccino':
-        corr_x = [3.9, 4.0, 4.1, 4.2, 4.3, 4.4, 4.5]
-        corr_y = [1300, 1250, 1200, 1170, 1130, 1080, 1050]
-
-    corr_fig = px.scatter(
-        x=corr_x, y=corr_y,
-        color_discrete_sequence=[coffee_colors.get(coffee_filter, colors['espresso'])],
-        labels={"x": "Price (₱)", "y": "Sales (cups)"}
-    ).update_layout(
-        plot_bgcolor=colors['card_bg'],
-        paper_bgcolor=colors['card_bg'],
-        font=dict(color=colors['text'], size=9),
-        margin=dict(l=5, r=5, t=5, b=5),
-        xaxis=dict(tickfont=dict(size=8), tickprefix='₱'),
-        yaxis=dict(tickfont=dict(size=8)),
+    correlation = price_correlation(data, coffee_filter)
+    corr_x, corr_y, corr_color = correlation['x'], correlation['y'], correlation['color']
+    x0, y0, x1, y1 = correlation['line']
+
+    corr_fig = figures.figure(
+        [figures.scatter(corr_x, corr_y, corr_color, hovertemplate='Price (₱)=%{x}<br>Sales (cups)=%{y}<extra></extra>')],
+        xaxis=dict(tickfont=dict(size=8), tickprefix='₱', title=dict(text="Price (₱)")),
+        yaxis=dict(tickfont=dict(size=8), title=dict(text="Sales (cups)")),
         height=130,
         showlegend=False
     ).add_shape(
         type="line",
-        x0=min(corr_x), y0=max(corr_y),
-        x1=max(corr_x), y1=min(corr_y),
-        line=dict(color=coffee_colors.get(coffee_filter, colors['espresso']), width=2)
+        x0=x0, y0=y0,
+        x1=x1, y1=y1,
+        line=dict(color=corr_color, width=2)
     ).add_annotation(
         # Moving the annotation to the top-right corner for better visibility
-        x=corr_x[-2],  # Using second-to-last x value
-        y=corr_y[-2],   # Using second y value (near the top)
-        text="Price Elasticity: -1.2",
+        x=correlation['label'][0],  # Using second-to-last x value
+        y=correlation['label'][1],   # Using second y value (near the top)
+        text=correlation['text'],
         showarrow=True,
         arrowhead=2,
         arrowsize=1,
         arrowwidth=1,
-        arrowcolor=coffee_colors.get(coffee_filter, colors['espresso']),
+        arrowcolor=corr_color,
         ax=-40,  # Add a horizontal arrow offset
         ay=30,   # Add a vertical arrow offset
         bgcolor=colors['card_bg'],
         opacity=0.8,
-        bordercolor=coffee_colors.get(coffee_filter, colors['espresso']),
+        bordercolor=corr_color,
         borderwidth=1,
         borderpad=4,
         font=dict(size=9, color=colors['text']),
@@ -1475,21 +735,15 @@ def generate_trends_view(coffee_filter):
     )
 
     # Fix the Customer Demographics pie chart overlapping labels
-    demo_fig = px.pie(
-        pd.DataFrame({
-            'Age Group': ['18-25', '26-35', '36-45', '46-55', '56+'],
-            'Percentage': [15, 35, 25, 15, 10]
-        }),
-        values='Percentage',
-        names='Age Group',
-        hole=0.4,
-        color_discrete_sequence=[colors['espresso'], colors['latte'], colors['cappuccino'],
-                                 '#A67B5B', '#8B7355']
-    ).update_layout(
-        plot_bgcolor=colors['card_bg'],
-        paper_bgcolor=colors['card_bg'],
-        font=dict(color=colors['text'], size=9),
-        margin=dict(l=5, r=5, t=5, b=5),
+    demo_fig = figures.figure(
+        [figures.donut(
+            ['18-25', '26-35', '36-45', '46-55', '56+'], [15, 35, 25, 15, 10],
+            color_sequence=[colors['espresso'], colors['latte'], colors['cappuccino'], '#A67B5B', '#8B7355'],
+            hole=0.4,
+            textposition='inside',
+            textinfo='percent',
+            hovertemplate='%{label}<br>%{percent}'
+        )],
         # Move the legend to the right side instead of bottom to avoid overlap
         legend=dict(
             orientation="v",
@@ -1500,17 +754,13 @@ def generate_trends_view(coffee_filter):
             font=dict(size=8)
         ),
         height=150  # Increased height to accommodate the legend
-    ).update_traces(
-        textposition='inside',
-        textinfo='percent',
-        hovertemplate='%{label}<br>%{percent}'
     )
 
     trends_view_updated = dbc.Row([
         dbc.Col([
             dbc.Card([
                 dbc.CardBody([
-                    html.H6("Coffee Price Trends (2014-2025)",
+                    html.H6(f"Coffee Price Trends ({years[0]}-{years[-1]})",
                             style={'fontSize': '12px', 'margin': '0 0 5px 0', 'fontWeight': 'bold'}),
                     dcc.Graph(
                         id="price-trend-chart",
@@ -1566,66 +816,163 @@ def generate_trends_view(coffee_filter):
 
     return [kpi_cards_updated, trends_view_updated]
 
-def generate_predictions_view(coffee_filter):
-    filtered_data = filter_data(coffee_filter)
+recommendation_styles = [
+    {"icon": "fas fa-lightbulb", "color": colors['warning']},
+    {"icon": "fas fa-chart-line", "color": colors['info']},
+    {"icon": "fas fa-tag", "color": colors['success']},
+    {"icon": "fas fa-clock", "color": colors['accent2']}
+]
+
+curated_recommendations = {
+    'all': [
+        "Focus on high-margin cold brew options for 2026",
+        "Espresso products show strongest growth trend since 2020",
+        "Consider 5% annual price increase across premium offerings",
+        "Long-term analysis suggests expanding store footprint"
+    ],
+    'Espresso': [
+        "Introduce seasonal espresso variations with premium beans",
+        "7-8% annual growth potential with targeted marketing",
+        "Historical data supports 7% price increase without affecting volume",
+        "Strongest annual growth observed in 2022-2024 period"
+    ],
+    'Latte': [
+        "Develop signature latte lineup for 2026-2028 seasons",
+        "Year-over-year growth stabilizing at 4.5% since 2022",
+        "Premium milk alternatives show higher profit margin potential",
+        "Annual sales pattern follows consistent upward trajectory"
+    ],
+    'Cappuccino': [
+        "Introduce signature art cappuccino to premium segment",
+        "Growing steadily at 5.6% annually since 2018",
+        "Historical price elasticity allows for 5-7% annual increases",
+        "Year-to-year consistency provides stable revenue foundation"
+    ]
+}
+
+
+def recommendation_texts(data, coffee_filter):
+    texts = curated_recommendations.get(coffee_filter)
+    if texts is not None:
+        return texts
+
+    years = data.years
+    units = data.cube.series(coffee_filter)[0][:, 0]
+    growth = (units[-1] / units[0]) ** (1 / max(len(units) - 1, 1)) - 1 if units[0] > 0 else 0.0
+    return [
+        f"Introduce seasonal {coffee_filter} variations for {years[-1] + 1}",
+        f"Sales growing {growth * 100:.1f}% a year since {years[0]}",
+        f"Review {coffee_filter} pricing against its historical elasticity",
+        f"Plan {coffee_filter} stock around the yearly sales pattern"
+    ]
+
+
+price_table_rows = 5
+price_target_years = 5
+
+
+def price_outlook(data, product):
+    """Latest price and a target that continues the historical price growth for ``price_target_years``"""
+    prices = data.cube.series(product.name, PRICE)[0][:, 0]
+    prices = prices[~np.isnan(prices)]
+    current = prices[-1]
+    yearly_change = (prices[-1] / prices[0]) ** (1 / max(len(prices) - 1, 1)) - 1
+    optimal = current * (1 + yearly_change) ** price_target_years
+    change = (optimal / current - 1) * 100
+    return {
+        "product": product.name,
+        "slug": product.slug,
+        "color": product.color,
+        "current": f"₱{current:,.2f}",
+        "optimal": f"₱{optimal:,.2f}",
+        "change": f"{change:+.1f}%",
+        "highlight": bool(change > 0)
+    }
+
+
+def growth_summary(data, coffee_filter):
+    """Texts and gauge value of the Long-term Revenue Growth card"""
+    years, future_years = data.years, data.future_years
+    current_annual, forecasted_annual, growth_rate, excluded = data.forecast_kpis.get(
+        data.cube.resolve(coffee_filter), (data.cube.summary(coffee_filter)['total_revenue'], None, None, 0)
+    )
+    # Once the fits are done a missing forecast failed for good rather than still being on its way
+    forecast_text = ("Unavailable" if data.forecasts_ready else "Pending") if forecasted_annual is None \
+        else f"₱{forecasted_annual:,.0f}"
+    excluded_text = f", excl. {excluded} without a forecast" if excluded and forecasted_annual is not None else ""
+    return {
+        'growth-current-value': f"₱{current_annual:,.0f}",
+        'growth-current-label': f"Current Total ({years[0]}-{years[-1]}{excluded_text})",
+        'growth-forecast-value': forecast_text,
+        'growth-forecast-label': f"Forecasted Total ({future_years[0]}-{future_years[-1]}{excluded_text})",
+        'growth-rate-value': "—" if growth_rate is None else f"{growth_rate:+.1f}%",
+        'gauge': growth_rate or 0
+    }
+
+
+def price_table_products(data, coffee_filter):
+    """Products in the price optimization table"""
+    return data.catalog.select(coffee_filter)[:price_table_rows]
+
+
+def generate_predictions_view(data, coffee_filter):
+    years = data.years
+    future_years = data.future_years
+    price_target_year = years[-1] + price_target_years
+    filtered_data = filter_data(data, coffee_filter)
     kpi_cards_updated = create_kpi_cards(filtered_data)
 
-    prediction_fig = go.Figure()
+    prediction_fig = figures.figure([])
+    history_length = len(years)
+    # NumPy arrays throughout so the traces are sent as typed arrays
+    history_x = np.asarray(years)
+    forecast_x = np.asarray(data.prediction_years[history_length - 1:])
 
-    if coffee_filter == 'all' or coffee_filter == 'Espresso':
+    for product in data.catalog.select(coffee_filter):
+        history = data.history(product.name)
         prediction_fig.add_trace(go.Scatter(
-            x=prediction_years[:12],
-            y=espresso_predictions[:12],
+            x=history_x,
+            y=history,
             mode='lines+markers',
-            name='Espresso',
-            line=dict(color=colors['espresso'], width=2)
-        ))
-        prediction_fig.add_trace(go.Scatter(
-            x=prediction_years[11:],
-            y=espresso_predictions[11:],
-            mode='lines+markers',
-            name='Espresso Forecast',
-            line=dict(color=colors['espresso'], width=2, dash='dot')
+            name=product.name,
+            line=dict(color=product.color, width=2)
         ))
 
-    if coffee_filter == 'all' or coffee_filter == 'Latte':
-        prediction_fig.add_trace(go.Scatter(
-            x=prediction_years[:12],
-            y=latte_predictions[:12],
-            mode='lines+markers',
-            name='Latte',
-            line=dict(color=colors['latte'], width=2)
-        ))
+        forecast = data.forecasts.get(product.name)
+        if forecast is None:
+            continue
+        # Prediction interval as a shaded band: upper edge first, lower edge filled up to it
         prediction_fig.add_trace(go.Scatter(
-            x=prediction_years[11:],
-            y=latte_predictions[11:],
-            mode='lines+markers',
-            name='Latte Forecast',
-            line=dict(color=colors['latte'], width=2, dash='dot')
+            x=forecast_x,
+            y=np.concatenate([history[-1:], forecast['upper']]),
+            mode='lines',
+            line=dict(width=0),
+            showlegend=False,
+            hoverinfo='skip',
+            legendgroup=product.name
         ))
-
-    if coffee_filter == 'all' or coffee_filter == 'Cappuccino':
         prediction_fig.add_trace(go.Scatter(
-            x=prediction_years[:12],
-            y=cappuccino_predictions[:12],
-            mode='lines+markers',
-            name='Cappuccino',
-            line=dict(color=colors['cappuccino'], width=2)
+            x=forecast_x,
+            y=np.concatenate([history[-1:], forecast['lower']]),
+            mode='lines',
+            line=dict(width=0),
+            fill='tonexty',
+            fillcolor=with_alpha(product.color, 0.15),
+            name=f'{product.name} 95% interval',
+            showlegend=False,
+            hoverinfo='skip',
+            legendgroup=product.name
         ))
-
         prediction_fig.add_trace(go.Scatter(
-            x=prediction_years[11:],
-            y=cappuccino_predictions[11:],
+            x=forecast_x,
+            y=np.concatenate([history[-1:], forecast['forecast']]),
             mode='lines+markers',
-            name='Cappuccino Forecast',
-            line=dict(color=colors['cappuccino'], width=2, dash='dot')
+            name=f'{product.name} Forecast',
+            line=dict(color=product.color, width=2, dash='dot'),
+            legendgroup=product.name
         ))
 
     prediction_fig.update_layout(
-        plot_bgcolor=colors['card_bg'],
-        paper_bgcolor=colors['card_bg'],
-        font=dict(color=colors['text'], size=9),
-        margin=dict(l=5, r=5, t=5, b=5),
         legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="right", x=1, font=dict(size=8)),
         xaxis=dict(tickfont=dict(size=8)),
         yaxis=dict(tickfont=dict(size=8)),
@@ -1654,107 +1001,25 @@ def generate_predictions_view(coffee_filter):
         }]
     )
 
-    current_annual = 147862000
-    forecasted_annual = 156435000
-    growth_rate = 5.8
-
-    if coffee_filter == 'Espresso':
-        current_annual = 42000000
-        forecasted_annual = 45360000
-        growth_rate = 8.0
-    elif coffee_filter == 'Latte':
-        current_annual = 65862000
-        forecasted_annual = 68825000
-        growth_rate = 4.5
-    elif coffee_filter == 'Cappuccino':
-        current_annual = 40000000
-        forecasted_annual = 42250000
-        growth_rate = 5.6
-
-    recommendations = []
+    growth = growth_summary(data, coffee_filter)
+    gauge_value = growth['gauge']
 
-    if coffee_filter == 'all':
-        recommendations = [
-            {"icon": "fas fa-lightbulb", "color": colors['warning'],
-             "text": "Focus on high-margin cold brew options for 2026"},
-            {"icon": "fas fa-chart-line", "color": colors['info'],
-             "text": "Espresso products show strongest growth trend since 2020"},
-            {"icon": "fas fa-tag", "color": colors['success'],
-             "text": "Consider 5% annual price increase across premium offerings"},
-            {"icon": "fas fa-clock", "color": colors['accent2'],
-             "text": "Long-term analysis suggests expanding store footprint"}
-        ]
-    elif coffee_filter == 'Espresso':
-        recommendations = [
-            {"icon": "fas fa-lightbulb", "color": colors['warning'],
-             "text": "Introduce seasonal espresso variations with premium beans"},
-            {"icon": "fas fa-chart-line", "color": colors['info'],
-             "text": "7-8% annual growth potential with targeted marketing"},
-            {"icon": "fas fa-tag", "color": colors['success'],
-             "text": "Historical data supports 7% price increase without affecting volume"},
-            {"icon": "fas fa-clock", "color": colors['accent2'],
-             "text": "Strongest annual growth observed in 2022-2024 period"}
-        ]
-    elif coffee_filter == 'Latte':
-        recommendations = [
-            {"icon": "fas fa-lightbulb", "color": colors['warning'],
-             "text": "Develop signature latte lineup for 2026-2028 seasons"},
-            {"icon": "fas fa-chart-line", "color": colors['info'],
-             "text": "Year-over-year growth stabilizing at 4.5% since 2022"},
-            {"icon": "fas fa-tag", "color": colors['success'],
-             "text": "Premium milk alternatives show higher profit margin potential"},
-            {"icon": "fas fa-clock", "color": colors['accent2'],
-             "text": "Annual sales pattern follows consistent upward trajectory"}
-        ]
-    elif coffee_filter == 'Cappuccino':
-        recommendations = [
-            {"icon": "fas fa-lightbulb", "color": colors['warning'],
-             "text": "Introduce signature art cappuccino to premium segment"},
-            {"icon": "fas fa-chart-line", "color": colors['info'],
-             "text": "Growing steadily at 5.6% annually since 2018"},
-            {"icon": "fas fa-tag", "color": colors['success'],
-             "text": "Historical price elasticity allows for 5-7% annual increases"},
-            {"icon": "fas fa-clock", "color": colors['accent2'],
-             "text": "Year-to-year consistency provides stable revenue foundation"}
-        ]
-
-    price_data = []
-
-    if coffee_filter == 'all' or coffee_filter == 'Espresso':
-        price_data.append({
-            "product": "Espresso",
-            "color": colors['espresso'],
-            "current": "₱3.75",
-            "optimal": "₱4.25",
-            "change": "+14.2%",
-            "highlight": True
-        })
-
-    if coffee_filter == 'all' or coffee_filter == 'Latte':
-        price_data.append({
-            "product": "Latte",
-            "color": colors['latte'],
-            "current": "₱4.80",
-            "optimal": "₱5.50",
-            "change": "+18.5%",
-            "highlight": True
-        })
+    recommendations = [
+        dict(style, text=text)
+        for style, text in zip(recommendation_styles, recommendation_texts(data, coffee_filter))
+    ]
 
-    if coffee_filter == 'all' or coffee_filter == 'Cappuccino':
-        price_data.append({
-            "product": "Cappuccino",
-            "color": colors['cappuccino'],
-            "current": "₱4.50",
-            "optimal": "₱5.10",
-            "change": "+16.8%",
-            "highlight": True
-        })
+    shown_prices = {product.name for product in price_table_products(data, coffee_filter)}
+    # In clientside mode the browser picks the rows for the selected product, so every product gets a row
+    price_products = data.catalog.select(coffee_filter) if CLIENTSIDE_FILTERS else price_table_products(
+        data, coffee_filter)
+    price_data = [price_outlook(data, product) for product in price_products]
 
     predictions_view_updated = dbc.Row([
         dbc.Col([
             dbc.Card([
                 dbc.CardBody([
-                    html.H6("Sales Forecast (2026-2029)",
+                    html.H6(f"Sales Forecast ({future_years[0]}-{future_years[-1]})",
                             style={'fontSize': '12px', 'margin': '0 0 5px 0', 'fontWeight': 'bold'}),
                     dcc.Graph(
                         id="predictions-chart",
@@ -1772,24 +1037,24 @@ def generate_predictions_view(coffee_filter):
                         dbc.Row([
                             dbc.Col([
                                 html.Div([
-                                    html.H5(f"₱{current_annual:,}",
+                                    html.H5(growth['growth-current-value'], id='growth-current-value',
                                             style={'fontSize': '14px', 'fontWeight': 'bold', 'margin': '0',
                                                    'color': colors['text']}),
-                                    html.P("Current Total (2014-2025)", style={'fontSize': '9px', 'margin': '0', 'color': '#777'})
+                                    html.P(growth['growth-current-label'], id='growth-current-label', style={'fontSize': '9px', 'margin': '0', 'color': '#777'})
                                 ], style={'textAlign': 'center'})
                             ], width=4),
                             dbc.Col([
                                 html.Div([
-                                    html.H5(f"₱{forecasted_annual:,}",
+                                    html.H5(growth['growth-forecast-value'], id='growth-forecast-value',
                                             style={'fontSize': '14px', 'fontWeight': 'bold', 'margin': '0',
                                                    'color': colors['success']}),
-                                    html.P("Forecasted Total (2026-2029)",
+                                    html.P(growth['growth-forecast-label'], id='growth-forecast-label',
                                            style={'fontSize': '9px', 'margin': '0', 'color': '#777'})
                                 ], style={'textAlign': 'center'})
                             ], width=4),
                             dbc.Col([
                                 html.Div([
-                                    html.H5(f"+{growth_rate}%",
+                                    html.H5(growth['growth-rate-value'], id='growth-rate-value',
                                             style={'fontSize': '14px', 'fontWeight': 'bold', 'margin': '0',
                                                    'color': colors['success']}),
                                     html.P("Growth Rate", style={'fontSize': '9px', 'margin': '0', 'color': '#777'})
@@ -1798,13 +1063,15 @@ def generate_predictions_view(coffee_filter):
                         ], className="mb-2"),
 
                         dcc.Graph(
-                            figure=go.Figure().add_trace(
+                            id='growth-gauge',
+                            figure=figures.figure([]).add_trace(
                                 go.Indicator(
                                     mode="gauge+number",
-                                    value=growth_rate,
+                                    value=gauge_value,
                                     title={'text': "Growth", 'font': {'size': 10}},
                                     gauge={
-                                        'axis': {'range': [0, 10], 'tickwidth': 1, 'tickfont': {'size': 8}},
+                                        'axis': {'range': [min(0, gauge_value), max(10, gauge_value)],
+                                                 'tickwidth': 1, 'tickfont': {'size': 8}},
                                         'bar': {'color': colors['success']},
                                         'steps': [
                                             {'range': [0, 3], 'color': '#EBE3D5'},
@@ -1814,7 +1081,7 @@ def generate_predictions_view(coffee_filter):
                                         'threshold': {
                                             'line': {'color': colors['accent2'], 'width': 2},
                                             'thickness': 0.8,
-                                            'value': growth_rate
+                                            'value': gauge_value
                                         }
                                     }
                                 )
@@ -1840,9 +1107,9 @@ def generate_predictions_view(coffee_filter):
                     html.Div([
                         *[html.Div([
                             html.I(className=rec["icon"] + " mr-2", style={'color': rec["color"]}),
-                            html.Span(rec["text"], style={'fontSize': '11px'})
+                            html.Span(rec["text"], id=f'recommendation-{position}', style={'fontSize': '11px'})
                         ], className="mb-2", style={'display': 'flex', 'alignItems': 'center', 'gap': '8px'})
-                            for rec in recommendations],
+                            for position, rec in enumerate(recommendations)],
                     ], style={'marginBottom': '10px'}),
                     dbc.Button("Generate New Insights",
                                color="light",
@@ -1868,10 +1135,10 @@ def generate_predictions_view(coffee_filter):
                                     html.Th("Product",
                                             style={'fontSize': '10px', 'textAlign': 'left', 'paddingRight': '8px',
                                                    'paddingBottom': '6px'}),
-                                    html.Th("2025 Price",
+                                    html.Th(f"{years[-1]} Price",
                                             style={'fontSize': '10px', 'textAlign': 'right', 'paddingRight': '8px',
                                                    'paddingBottom': '6px'}),
-                                    html.Th("2030 Target",
+                                    html.Th(f"{price_target_year} Target",
                                             style={'fontSize': '10px', 'textAlign': 'right', 'paddingRight': '8px',
                                                    'paddingBottom': '6px'}),
                                     html.Th("∆ Revenue",
@@ -1896,7 +1163,10 @@ def generate_predictions_view(coffee_filter):
                                             style={'fontSize': '10px', 'textAlign': 'right',
                                                    'color': colors['success'] if item["highlight"] else 'inherit',
                                                    'padding': '8px 0'})
-                                ], style={'borderBottom': '1px solid #f5f5f5'}) for item in price_data]
+                                ], id=f'price-row-{item["slug"]}', style={
+                                    'borderBottom': '1px solid #f5f5f5',
+                                    'display': None if item["product"] in shown_prices else 'none'
+                                }) for item in price_data]
                             ])
                         ], style={'width': '100%'}),
 
@@ -1904,7 +1174,7 @@ def generate_predictions_view(coffee_filter):
                         html.Div([
                             html.Hr(style={'margin': '15px 0 10px 0', 'opacity': '0.3'}),
                             html.Div([
-                                html.Small("Suggested price changes for 2026-2030 period",
+                                html.Small(f"Suggested price changes for {years[-1] + 1}-{price_target_year} period",
                                            style={'fontSize': '9px', 'fontStyle': 'italic', 'color': '#777',
                                                   'marginBottom': '5px'}),
                             ], style={'textAlign': 'center'}),
@@ -1925,6 +1195,61 @@ def generate_predictions_view(coffee_filter):
 
     return [kpi_cards_updated, predictions_view_updated]
 
+
+view_generators = {
+    'dashboard': generate_dashboard_view,
+    'trends': generate_trends_view,
+    'predictions': generate_predictions_view
+}
+
+# Rendered views by (view, filter); the version drops them when the data or the forecasts change
+view_cache = ViewCache()
+
+
+def render_view(view, coffee_filter, data=None):
+    data = data or current()
+    coffee_filter = data.cube.resolve(coffee_filter)
+    if data is not snapshot:
+        # Started on a snapshot that has since been replaced: finish on it, but keep it out of the cache
+        return view_generators[view](data, coffee_filter)
+    return view_cache.get_or_render(
+        (view, coffee_filter),
+        data.version,
+        lambda: view_generators[view](data, coffee_filter)
+    )
+
+
+def rendered(data, view, coffee_filter):
+    return {'view': view, 'filter': data.cube.resolve(coffee_filter), 'version': data.version}
+
+
+def forecast_progress(data):
+    """``(done, total)`` of the forecast fits behind ``data``.
+
+    A local store counts each fit as it lands; with a shared store only the
+    forecasts the refresher has published so far are known.
+    """
+    if forecast_store is not None:
+        return forecast_store.progress()
+    return len(data.forecasts), len(data.catalog)
+
+
+def server_filter(active_filter):
+    """Filter the server renders for; in clientside mode the browser narrows the all-products view itself"""
+    return 'all' if CLIENTSIDE_FILTERS else active_filter
+
+
+def warm_view_cache(data):
+    """Fill the view cache for the popular states of ``data`` in the background"""
+    filters = ['all'] if CLIENTSIDE_FILTERS else prerender.popular_filters(data.cube)
+    prerender.start(lambda view, coffee_filter: render_view(view, coffee_filter, data), view_generators, filters)
+
+
+# Again whenever new forecasts or a new shared snapshot have cleared the cache
+warm_view_cache(current())
+if forecast_store is not None:
+    forecast_store.subscribe(lambda store: warm_view_cache(snapshot))
+
 app.index_string = '''
 <!DOCTYPE html>
 <html>
@@ -1978,34 +1303,77 @@ app.index_string = '''
 </html>
 '''
 
-app.layout = html.Div([
-    html.Script('''
-        document.addEventListener('DOMContentLoaded', function() {
-            // 根据屏幕高度动态调整缩放
-            const vh = window.innerHeight;
-            if (vh < 800) {
-                document.body.style.zoom = "90%";
-            }
-            if (vh < 700) {
-                document.body.style.zoom = "80%";
-            }
-        });
-    '''),
-    sidebar,
-    html.Div([
-        header,
-        content_area
+def build_layout(data):
+    content_area = html.Div([
+        dcc.Store(id='active-view-store', data='dashboard'),
+        dcc.Store(id='active-filter-store', data='all'),
+        # The (view, filter, data version) currently shown in view-content, so filter changes can be sent as patches
+        dcc.Store(id='rendered-view-store', data=rendered(data, 'dashboard', 'all')),
+        # KPI texts per filter and the product list for the clientside filter mode
+        dcc.Store(id='filter-aggregates', data=filter_aggregates(data) if CLIENTSIDE_FILTERS else None),
+        # Polls until the background forecast fits finish, then stops; shows their progress on the predictions view
+        dcc.Interval(id='forecast-poll', interval=2000, disabled=data.forecasts_ready),
+        html.Div([
+            dbc.Spinner(size='sm', color='warning', spinner_style={'marginRight': '8px'}),
+            html.Small(id='forecast-progress-label', style={'color': '#777', 'fontSize': '10px'}),
+            dbc.Progress(id='forecast-progress', value=0, max=1, color='warning', style={'height': '4px'})
+        ], id='forecast-progress-panel', style={'display': 'none'}),
+        html.Div(id='view-content', children=render_view('dashboard', 'all', data))
+    ], style={
+        'marginLeft': '150px',  # Make room for the sidebar
+        'padding': '10px',
+        'height': '100vh',
+        'overflowY': 'auto'
+    })
+
+    return html.Div([
+        html.Script('''
+            document.addEventListener('DOMContentLoaded', function() {
+                // 根据屏幕高度动态调整缩放
+                const vh = window.innerHeight;
+                if (vh < 800) {
+                    document.body.style.zoom = "90%";
+                }
+                if (vh < 700) {
+                    document.body.style.zoom = "80%";
+                }
+            });
+        '''),
+        build_sidebar(data),
+        html.Div([
+            header,
+            content_area
+        ], style={
+            'width': 'calc(100% - 220px)',
+            'float': 'right',
+            'overflow': 'hidden'
+        })
     ], style={
-        'width': 'calc(100% - 220px)',
-        'float': 'right',
+        'backgroundColor': colors['background'],
+        'fontFamily': '"Raleway", sans-serif',
+        'height': '100vh',
         'overflow': 'hidden'
     })
-], style={
-    'backgroundColor': colors['background'],
-    'fontFamily': '"Raleway", sans-serif',
-    'height': '100vh',
-    'overflow': 'hidden'
-})
+
+
+# Built on the first page load rather than at import, and rebuilt only when the data or the forecasts change
+layouts = {}
+# Page loads that arrive together while the layout is being built wait for that one build
+layout_flights = SingleFlight()
+
+
+def serve_layout():
+    data = current()
+    key = (data.version, data.forecasts_ready)
+    layout = layouts.get(key)
+    if layout is None:
+        layout = layout_flights.do(key, lambda: build_layout(data))
+        layouts.clear()
+        layouts[key] = layout
+    return layout
+
+
+app.layout = serve_layout
 
 @app.callback(
     [Output('nav-dashboard', 'active'),
@@ -2020,25 +1388,11 @@ def update_nav_active(active_view):
 
     return is_dashboard, is_trends, is_predictions
 
-@app.callback(
-    [Output('filter-all', 'active'),
-     Output('filter-espresso', 'active'),
-     Output('filter-latte', 'active'),
-     Output('filter-cappuccino', 'active')],
-    [Input('active-filter-store', 'data')]
-)
-def update_filter_active(active_filter):
-    is_all = active_filter == 'all'
-    is_espresso = active_filter == 'Espresso'
-    is_latte = active_filter == 'Latte'
-    is_cappuccino = active_filter == 'Cappuccino'
-
-    return is_all, is_espresso, is_latte, is_cappuccino
-
 @app.callback(
     [Output('view-content', 'children'),
      Output('active-view-store', 'data'),
-     Output('active-view', 'children')],
+     Output('active-view', 'children'),
+     Output('rendered-view-store', 'data')],
     [Input('nav-dashboard', 'n_clicks'),
      Input('nav-trends', 'n_clicks'),
      Input('nav-predictions', 'n_clicks')],
@@ -2047,64 +1401,130 @@ def update_filter_active(active_filter):
 )
 def update_view(dashboard_clicks, trends_clicks, predictions_clicks, active_view, active_filter):
     ctx = dash.callback_context
-    if not ctx.triggered:
-        return generate_dashboard_view(active_filter), 'dashboard', "OVERVIEW"
-
-    button_id = ctx.triggered[0]['prop_id'].split('.')[0]
+    view, label = 'dashboard', "OVERVIEW"
+
+    if ctx.triggered:
+        button_id = ctx.triggered[0]['prop_id'].split('.')[0]
+        if button_id == 'nav-trends':
+            view, label = 'trends', "TRENDS"
+        elif button_id == 'nav-predictions':
+            view, label = 'predictions', "PREDICTIONS"
+
+    data = current()
+    active_filter = server_filter(active_filter)
+    return render_view(view, active_filter, data), view, label, rendered(data, view, active_filter)
+
+if CLIENTSIDE_FILTERS:
+    # The browser switches filters itself on the all-products view; see assets/filters.js
+    app.clientside_callback(
+        ClientsideFunction(namespace='filters', function_name='select'),
+        Output('active-filter-store', 'data'),
+        [Input({'type': 'coffee-filter', 'index': ALL}, 'n_clicks'),
+         Input('filter-all', 'n_clicks')],
+        [State('filter-aggregates', 'data'),
+         State('active-filter-store', 'data')]
+    )
+    app.clientside_callback(
+        ClientsideFunction(namespace='filters', function_name='highlight'),
+        [Output('filter-all', 'active'),
+         Output({'type': 'coffee-filter', 'index': ALL}, 'active')],
+        [Input('active-filter-store', 'data')],
+        [State('filter-aggregates', 'data')]
+    )
+    app.clientside_callback(
+        ClientsideFunction(namespace='filters', function_name='apply'),
+        Output('view-content', 'children', allow_duplicate=True),
+        [Input('active-filter-store', 'data'),
+         Input('rendered-view-store', 'data')],
+        [State('view-content', 'children'),
+         State('filter-aggregates', 'data')],
+        prevent_initial_call=True
+    )
+else:
+    @app.callback(
+        [Output('filter-all', 'active'),
+         Output({'type': 'coffee-filter', 'index': ALL}, 'active')],
+        [Input('active-filter-store', 'data')]
+    )
+    def update_filter_active(active_filter):
+        active_product = current().catalog.by_name.get(active_filter)
+        active_slug = active_product.slug if active_product else None
+        filter_outputs = dash.callback_context.outputs_list[1]
+
+        return active_product is None, [output['id']['index'] == active_slug for output in filter_outputs]
+
+    @app.callback(
+        Output('active-filter-store', 'data'),
+        [Input({'type': 'coffee-filter', 'index': ALL}, 'n_clicks'),
+         Input('filter-all', 'n_clicks')],
+        [State('active-filter-store', 'data')]
+    )
+    def update_coffee_filter(product_clicks, all_clicks, active_filter):
+        ctx = dash.callback_context
+        if not ctx.triggered:
+            return active_filter
 
-    if button_id == 'nav-dashboard':
-        return generate_dashboard_view(active_filter), 'dashboard', "OVERVIEW"
-    elif button_id == 'nav-trends':
-        return generate_trends_view(active_filter), 'trends', "TRENDS"
-    elif button_id == 'nav-predictions':
-        return generate_predictions_view(active_filter), 'predictions', "PREDICTIONS"
+        button_id = ctx.triggered_id
 
-    return generate_dashboard_view(active_filter), 'dashboard', "OVERVIEW"
+        if button_id == 'filter-all':
+            return 'all'
+        elif isinstance(button_id, dict):
+            product = current().catalog.by_slug.get(button_id['index'])
+            return product.name if product else 'all'
 
-@app.callback(
-    Output('active-filter-store', 'data'),
-    [Input('filter-espresso', 'n_clicks'),
-     Input('filter-latte', 'n_clicks'),
-     Input('filter-cappuccino', 'n_clicks'),
-     Input('filter-all', 'n_clicks')],
-    [State('active-filter-store', 'data')]
-)
-def update_coffee_filter(espresso_clicks, latte_clicks, cappuccino_clicks, all_clicks, active_filter):
-    ctx = dash.callback_context
-    if not ctx.triggered:
         return active_filter
 
-    button_id = ctx.triggered[0]['prop_id'].split('.')[0]
-
-    if button_id == 'filter-all':
-        return 'all'
-    elif button_id == 'filter-espresso':
-        return 'Espresso'
-    elif button_id == 'filter-latte':
-        return 'Latte'
-    elif button_id == 'filter-cappuccino':
-        return 'Cappuccino'
-
-    return active_filter
+    @app.callback(
+        [Output('view-content', 'children', allow_duplicate=True),
+         Output('rendered-view-store', 'data', allow_duplicate=True)],
+        [Input('active-filter-store', 'data')],
+        [State('active-view-store', 'data'),
+         State('rendered-view-store', 'data')],
+        prevent_initial_call=True
+    )
+    def update_view_on_filter_change(active_filter, active_view, shown):
+        if active_view not in view_generators:
+            active_view = 'dashboard'
+        data = current()
+        view = render_view(active_view, active_filter, data)
+        # Send only what changed relative to the view on screen when it came from the same data
+        if shown and shown['view'] == active_view and shown['version'] == data.version:
+            view = view_patch.patch_or_replace(render_view(shown['view'], shown['filter'], data), view)
+        return view, rendered(data, active_view, active_filter)
 
 @app.callback(
-    Output('view-content', 'children', allow_duplicate=True),
-    [Input('active-filter-store', 'data')],
-    [State('active-view-store', 'data')],
+    [Output('view-content', 'children', allow_duplicate=True),
+     Output('forecast-poll', 'disabled'),
+     Output('rendered-view-store', 'data', allow_duplicate=True),
+     Output('forecast-progress-panel', 'style'),
+     Output('forecast-progress', 'value'),
+     Output('forecast-progress', 'max'),
+     Output('forecast-progress-label', 'children'),
+     Output('filter-aggregates', 'data')],
+    [Input('forecast-poll', 'n_intervals')],
+    [State('active-view-store', 'data'),
+     State('active-filter-store', 'data')],
     prevent_initial_call=True
 )
-def update_view_on_filter_change(active_filter, active_view):
-    if active_view == 'dashboard':
-        return generate_dashboard_view(active_filter)
-    elif active_view == 'trends':
-        return generate_trends_view(active_filter)
-    elif active_view == 'predictions':
-        return generate_predictions_view(active_filter)
-
-    return generate_dashboard_view(active_filter)
-
+def show_forecasts_when_ready(n_intervals, active_view, active_filter):
+    data = current()
+    if not data.forecasts_ready:
+        done, total = forecast_progress(data)
+        panel = {'display': 'block' if active_view == 'predictions' else 'none', 'padding': '0 10px 6px 10px'}
+        return (dash.no_update, False, dash.no_update, panel, done, max(total, 1),
+                f"Fitting forecasts: {done} of {total} ready", dash.no_update)
+    hidden = {'display': 'none'}
+    # The forecast KPIs the browser filters in clientside mode changed with the forecasts
+    aggregates = filter_aggregates(data) if CLIENTSIDE_FILTERS else dash.no_update
+    if active_view == 'predictions':
+        active_filter = server_filter(active_filter)
+        return (render_view('predictions', active_filter, data), True, rendered(data, 'predictions', active_filter),
+                hidden, dash.no_update, dash.no_update, dash.no_update, aggregates)
+
+    return dash.no_update, True, dash.no_update, hidden, dash.no_update, dash.no_update, dash.no_update, aggregates
 
 if __name__ == '__main__':
+    start_watcher()
     app.run_server(debug=False)
 
 
@@ -0,0 +1,134 @@
+// Clientside coffee filter (DASHBOARD_CLIENTSIDE_FILTERS=1).
+// The server renders every view for all products once; these functions pick
+// the filter, highlight its sidebar link and show only the selected product's
+// traces, taking KPI texts from the per-filter aggregates in 'filter-aggregates'.
+// Cards that are not made of per-product traces (revenue growth, gauge,
+// recommendations, price table, sales vs price) are filled in from there too.
+window.dash_clientside = Object.assign({}, window.dash_clientside, {
+    filters: {
+        select: function (productClicks, allClicks, aggregates, activeFilter) {
+            const triggered = dash_clientside.callback_context.triggered;
+            if (!triggered || !triggered.length || triggered[0].value === null) {
+                return activeFilter;
+            }
+            const propId = triggered[0].prop_id;
+            const componentId = propId.slice(0, propId.lastIndexOf('.'));
+            if (componentId === 'filter-all') {
+                return 'all';
+            }
+            const slug = JSON.parse(componentId).index;
+            return aggregates.names[aggregates.slugs.indexOf(slug)];
+        },
+
+        highlight: function (activeFilter, aggregates) {
+            return [
+                activeFilter === 'all',
+                aggregates.names.map(function (name) { return name === activeFilter; })
+            ];
+        },
+
+        apply: function (activeFilter, rendered, children, aggregates) {
+            if (!children) {
+                return dash_clientside.no_update;
+            }
+            const products = new Set(aggregates.names);
+            const kpis = aggregates.kpis[activeFilter] || aggregates.kpis.all;
+            const kpiText = {
+                'total-sales-value': kpis.total_sales,
+                'yearly-avg-value': kpis.yearly_avg,
+                'revenue-value': kpis.total_revenue,
+                'top-product-value': kpis.top_coffee
+            };
+            const shown = function (product) {
+                return activeFilter === 'all' || product === activeFilter;
+            };
+            const pick = function (table) {
+                return table[activeFilter] || table.all;
+            };
+            const growth = pick(aggregates.growth);
+            const recommendations = pick(aggregates.recommendations);
+            const correlation = pick(aggregates.correlation);
+            const priceRows = new Set(pick(aggregates.price_rows).map(function (slug) {
+                return 'price-row-' + slug;
+            }));
+            const startsWith = function (id, prefix) {
+                return typeof id === 'string' && id.indexOf(prefix) === 0;
+            };
+
+            const updateGauge = function (figure) {
+                const indicator = figure.data[0];
+                indicator.value = growth.gauge;
+                indicator.gauge.threshold.value = growth.gauge;
+                indicator.gauge.axis.range = [Math.min(0, growth.gauge), Math.max(10, growth.gauge)];
+            };
+            const updateCorrelation = function (figure) {
+                const trace = figure.data[0];
+                trace.x = correlation.x;
+                trace.y = correlation.y;
+                trace.marker = Object.assign({}, trace.marker, {color: correlation.color});
+                const shape = figure.layout.shapes[0];
+                [shape.x0, shape.y0, shape.x1, shape.y1] = correlation.line;
+                shape.line = Object.assign({}, shape.line, {color: correlation.color});
+                const annotation = figure.layout.annotations[0];
+                [annotation.x, annotation.y] = correlation.label;
+                annotation.text = correlation.text;
+                annotation.arrowcolor = correlation.color;
+                annotation.bordercolor = correlation.color;
+            };
+
+            const visit = function (node) {
+                if (Array.isArray(node)) {
+                    node.forEach(visit);
+                    return;
+                }
+                if (!node || typeof node !== 'object' || !node.props) {
+                    return;
+                }
+                const props = node.props;
+                if (typeof props.id === 'string' && props.id !== 'gauge' && props.id in growth) {
+                    props.children = growth[props.id];
+                }
+                if (startsWith(props.id, 'recommendation-')) {
+                    props.children = recommendations[Number(props.id.slice('recommendation-'.length))];
+                }
+                if (startsWith(props.id, 'price-row-')) {
+                    props.style = Object.assign({}, props.style, {display: priceRows.has(props.id) ? null : 'none'});
+                }
+                if (props.id in kpiText) {
+                    props.children = kpiText[props.id];
+                    if (props.id === 'top-product-value') {
+                        props.style = Object.assign({}, props.style, {color: kpis.top_color});
+                    }
+                }
+                if (props.figure) {
+                    props.figure.data.forEach(function (trace) {
+                        if (trace.type === 'pie') {
+                            props.figure.layout.hiddenlabels = (trace.labels || []).filter(function (label) {
+                                return products.has(label) && !shown(label);
+                            });
+                            return;
+                        }
+                        const product = trace.legendgroup || trace.name;
+                        if (products.has(product)) {
+                            trace.visible = shown(product);
+                        }
+                    });
+                    if (props.id === 'share-pie-chart' && props.figure.layout.annotations) {
+                        props.figure.layout.annotations[0].text = kpis.total_sales;
+                    }
+                    if (props.id === 'growth-gauge') {
+                        updateGauge(props.figure);
+                    }
+                    if (props.id === 'correlation-chart') {
+                        updateCorrelation(props.figure);
+                    }
+                }
+                visit(props.children);
+            };
+
+            const updated = JSON.parse(JSON.stringify(children));
+            visit(updated);
+            return updated;
+        }
+    }
+});
@@ -0,0 +1,174 @@
+"""Rolling-origin backtest of the dashboard forecasters.
+
+For every product series and every forecast origin from ``--min-train``
+onwards, each model is fitted on the history before the origin and scored
+against the next ``--horizon`` actual values. ARIMA folds run in parallel on
+a process pool; the batch methods fit all series of a fold at once. MAPE,
+RMSE and fit time per model and per series are written to a JSON file.
+
+    python backtest.py --models arima ar1 holt --output backtest.json
+"""
+import argparse
+import json
+import logging
+import os
+import time
+import warnings
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+
+import batch_forecast
+import data_loader
+from forecasting import ARIMA, DEFAULT_ORDER, FORECAST_WORKERS, fit_series, parse_order
+
+logger = logging.getLogger(__name__)
+
+MODELS = [ARIMA] + sorted(batch_forecast.METHODS)
+
+
+def load_series(path):
+    np.random.seed(42)
+    sales_data = data_loader.load_sales_data(path)
+    return {name: sales_data[name].to_numpy(dtype='float64') for name in data_loader.coffee_type_columns(sales_data)}
+
+
+def origins(length, min_train):
+    return range(min_train, length)
+
+
+def _fit_arima_fold(name, origin, train, horizon, order):
+    # statsmodels warns about starting parameters on short training windows
+    warnings.simplefilter('ignore')
+    _, entry, seconds, error = fit_series(name, train, horizon, order)
+    return name, origin, None if entry is None else entry['forecast'], seconds, error
+
+
+def run_arima(series, horizon, min_train, order, workers):
+    """Yield ``(name, origin, forecast, seconds, error)`` for every ARIMA fold"""
+    tasks = [(name, origin, values[:origin], horizon, order)
+             for name, values in series.items() for origin in origins(len(values), min_train)]
+    if workers <= 1:
+        for task in tasks:
+            yield _fit_arima_fold(*task)
+        return
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = [executor.submit(_fit_arima_fold, *task) for task in tasks]
+        for future in as_completed(futures):
+            yield future.result()
+
+
+def run_batch(series, horizon, min_train, method):
+    """Yield ``(name, origin, forecast, seconds, error)`` for every fold of a batch method"""
+    names = list(series)
+    matrix = np.vstack([series[name] for name in names])
+    for origin in origins(matrix.shape[1], min_train):
+        started = time.perf_counter()
+        try:
+            forecasts = batch_forecast.batch_forecast(matrix[:, :origin], horizon, method)[0]
+            error = None
+        except Exception as exc:
+            forecasts = [None] * len(names)
+            error = f"{type(exc).__name__}: {exc}"
+        # The fold is one fit for all series; each series is charged an equal share
+        seconds = (time.perf_counter() - started) / len(names)
+        for name, forecast in zip(names, forecasts):
+            yield name, origin, forecast, seconds, error
+
+
+def scores(errors, actuals):
+    errors = np.asarray(errors, dtype='float64')
+    actuals = np.asarray(actuals, dtype='float64')
+    if not len(errors):
+        return None, None
+    nonzero = actuals != 0
+    mape = float(np.mean(np.abs(errors[nonzero] / actuals[nonzero])) * 100) if nonzero.any() else None
+    return mape, float(np.sqrt(np.mean(errors ** 2)))
+
+
+def backtest(series, models, horizon, min_train, order=DEFAULT_ORDER, workers=FORECAST_WORKERS):
+    report = {'models': {}, 'series': {}}
+    for model in models:
+        started = time.perf_counter()
+        if model == ARIMA:
+            folds = run_arima(series, horizon, min_train, order, workers)
+        else:
+            folds = run_batch(series, horizon, min_train, model)
+
+        collected = defaultdict(lambda: {'errors': [], 'actuals': [], 'seconds': 0.0, 'folds': 0, 'failed': 0})
+        for name, origin, forecast, seconds, error in folds:
+            result = collected[name]
+            result['seconds'] += seconds
+            result['folds'] += 1
+            if error is not None:
+                result['failed'] += 1
+                logger.debug("%s fold %s/%d failed: %s", model, name, origin, error)
+                continue
+            actual = series[name][origin:origin + horizon]
+            result['errors'].extend(np.asarray(forecast[:len(actual)]) - actual)
+            result['actuals'].extend(actual)
+
+        per_series = {}
+        for name, result in collected.items():
+            mape, rmse = scores(result['errors'], result['actuals'])
+            per_series[name] = {
+                'mape': mape,
+                'rmse': rmse,
+                'fit_seconds': result['seconds'],
+                'folds': result['folds'],
+                'failed': result['failed']
+            }
+
+        mape, rmse = scores(
+            [error for result in collected.values() for error in result['errors']],
+            [actual for result in collected.values() for actual in result['actuals']]
+        )
+        fit_seconds = sum(result['seconds'] for result in collected.values())
+        folds = sum(result['folds'] for result in collected.values())
+        report['models'][model] = {
+            'mape': mape,
+            'rmse': rmse,
+            'fit_seconds': fit_seconds,
+            'mean_fit_seconds': fit_seconds / folds if folds else None,
+            'wall_seconds': time.perf_counter() - started,
+            'folds': folds,
+            'failed': sum(result['failed'] for result in collected.values())
+        }
+        report['series'][model] = per_series
+        logger.info("%s: MAPE %s%%, RMSE %s over %d folds in %.2fs", model,
+                    'n/a' if mape is None else f'{mape:.2f}', 'n/a' if rmse is None else f'{rmse:.1f}',
+                    folds, report['models'][model]['wall_seconds'])
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--data', default=os.environ.get('DASHBOARD_DATA_PATH'),
+                        help="transaction file, directory or glob (default: DASHBOARD_DATA_PATH or demo data)")
+    parser.add_argument('--models', nargs='+', choices=MODELS, default=MODELS)
+    parser.add_argument('--horizon', type=int, default=4)
+    parser.add_argument('--min-train', type=int, default=6, help="observations before the first origin")
+    parser.add_argument('--order', default=','.join(map(str, DEFAULT_ORDER)), help="ARIMA order as p,d,q")
+    parser.add_argument('--workers', type=int, default=FORECAST_WORKERS)
+    parser.add_argument('--output', default='backtest_results.json')
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format='%(message)s')
+
+    series = load_series(args.data)
+    report = backtest(series, args.models, args.horizon, args.min_train, parse_order(args.order), args.workers)
+    report.update({
+        'horizon': args.horizon,
+        'min_train': args.min_train,
+        'order': list(parse_order(args.order)),
+        'series_count': len(series),
+        'generated_at': time.strftime('%Y-%m-%dT%H:%M:%S%z')
+    })
+    with open(args.output, 'w', encoding='utf-8') as handle:
+        json.dump(report, handle, indent=2)
+    logger.info("Wrote %s", args.output)
+
+
+if __name__ == '__main__':
+    main()
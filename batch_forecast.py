@@ -0,0 +1,124 @@
+"""Vectorised forecasters that fit every series at once.
+
+Each method takes a 2-D array with one series per row (all rows the same
+length) and returns ``(n_series, periods)`` arrays of point forecasts and of
+their standard errors, from which ``batch_forecast`` builds normal prediction
+intervals. The models are deliberately simple so that thousands of series fit
+in milliseconds; ``forecasting.predict_future_values`` (statsmodels ARIMA)
+remains the accurate option. Select between them with ``DASHBOARD_FORECAST_METHOD``.
+"""
+from statistics import NormalDist
+
+import numpy as np
+
+# Smoothing parameters searched by ``holt_forecast``; every series picks the
+# pair with the lowest one-step-ahead squared error.
+HOLT_ALPHAS = np.array([0.1, 0.2, 0.3, 0.4, 0.5, 0.6, 0.7, 0.8, 0.9])
+HOLT_BETAS = np.array([0.05, 0.1, 0.2, 0.3, 0.5])
+
+# Keeps the AR(1) fit stationary, like the ARIMA(1, 0, 0) it stands in for
+MAX_AR_COEFFICIENT = 0.99
+
+
+def _as_matrix(series):
+    matrix = np.asarray(series, dtype='float64')
+    if matrix.ndim == 1:
+        matrix = matrix[np.newaxis, :]
+    if matrix.shape[1] < 2:
+        raise ValueError("Batch forecasting needs at least two observations per series")
+    return matrix
+
+
+def _residual_scale(residuals, parameters):
+    degrees_of_freedom = max(residuals.shape[1] - parameters, 1)
+    return np.sqrt((residuals ** 2).sum(axis=1) / degrees_of_freedom)
+
+
+def ar1_forecast(series, periods):
+    """AR(1) with intercept, fitted per row by ordinary least squares on (y[t-1], y[t])"""
+    matrix = _as_matrix(series)
+    previous = matrix[:, :-1]
+    current = matrix[:, 1:]
+
+    previous_mean = previous.mean(axis=1, keepdims=True)
+    current_mean = current.mean(axis=1, keepdims=True)
+    centred = previous - previous_mean
+    variance = (centred ** 2).sum(axis=1)
+    covariance = (centred * (current - current_mean)).sum(axis=1)
+
+    phi = np.divide(covariance, variance, out=np.zeros_like(variance), where=variance > 0)
+    phi = np.clip(phi, -MAX_AR_COEFFICIENT, MAX_AR_COEFFICIENT)
+    intercept = current_mean[:, 0] - phi * previous_mean[:, 0]
+
+    forecasts = np.empty((matrix.shape[0], periods))
+    level = matrix[:, -1]
+    for step in range(periods):
+        level = intercept + phi * level
+        forecasts[:, step] = level
+
+    # h-step variance of an AR(1): sigma^2 * (1 + phi^2 + ... + phi^(2(h-1)))
+    sigma = _residual_scale(current - intercept[:, np.newaxis] - phi[:, np.newaxis] * previous, 2)
+    growth = np.cumsum(phi[:, np.newaxis] ** (2 * np.arange(periods)), axis=1)
+    return forecasts, sigma[:, np.newaxis] * np.sqrt(growth)
+
+
+def holt_forecast(series, periods, alphas=HOLT_ALPHAS, betas=HOLT_BETAS):
+    """Holt's additive-trend smoothing; all (alpha, beta) candidates run side by side for every row"""
+    matrix = _as_matrix(series)
+    alpha_grid, beta_grid = np.meshgrid(alphas, betas, indexing='ij')
+    alpha = alpha_grid.ravel()[np.newaxis, :]
+    beta = beta_grid.ravel()[np.newaxis, :]
+
+    # (n_series, n_candidates) state, one column per smoothing pair
+    level = np.repeat(matrix[:, :1], alpha.shape[1], axis=1)
+    trend = np.repeat(matrix[:, 1:2] - matrix[:, :1], alpha.shape[1], axis=1)
+    squared_error = np.zeros_like(level)
+    for step in range(1, matrix.shape[1]):
+        observed = matrix[:, step:step + 1]
+        predicted = level + trend
+        squared_error += (observed - predicted) ** 2
+        new_level = alpha * observed + (1 - alpha) * predicted
+        trend = beta * (new_level - level) + (1 - beta) * trend
+        level = new_level
+
+    best = squared_error.argmin(axis=1)
+    rows = np.arange(matrix.shape[0])
+    horizon = np.arange(1, periods + 1)
+    forecasts = level[rows, best][:, np.newaxis] + trend[rows, best][:, np.newaxis] * horizon
+
+    # h-step variance of Holt's method: sigma^2 * (1 + sum_{j<h} (alpha * (1 + j * beta))^2)
+    sigma = np.sqrt(squared_error[rows, best] / max(matrix.shape[1] - 3, 1))
+    weights = (alpha[0, best][:, np.newaxis] * (1 + np.arange(periods) * beta[0, best][:, np.newaxis])) ** 2
+    weights[:, 0] = 0.0
+    return forecasts, sigma[:, np.newaxis] * np.sqrt(1 + np.cumsum(weights, axis=1))
+
+
+def seasonal_naive_forecast(series, periods, season_length=1):
+    """Repeat the last observed season; ``season_length=1`` is the plain naive forecast"""
+    matrix = _as_matrix(series)
+    season_length = min(season_length, matrix.shape[1] - 1)
+    last_season = matrix[:, -season_length:]
+    steps = np.arange(periods)
+    forecasts = last_season[:, steps % season_length]
+
+    # Each further season ahead adds another seasonal-difference error
+    sigma = _residual_scale(matrix[:, season_length:] - matrix[:, :-season_length], 0)
+    return forecasts, sigma[:, np.newaxis] * np.sqrt(steps // season_length + 1)
+
+
+METHODS = {
+    'ar1': ar1_forecast,
+    'holt': holt_forecast,
+    'seasonal_naive': seasonal_naive_forecast,
+}
+
+
+def batch_forecast(series, periods, method='ar1', alpha=0.05):
+    """Point forecasts and the ``1 - alpha`` normal prediction interval: ``(forecast, lower, upper)``"""
+    try:
+        forecaster = METHODS[method]
+    except KeyError:
+        raise ValueError(f"Unknown batch forecast method {method!r}; expected one of {sorted(METHODS)}") from None
+    forecasts, standard_errors = forecaster(series, periods)
+    margin = NormalDist().inv_cdf(1 - alpha / 2) * standard_errors
+    return forecasts, forecasts - margin, forecasts + margin
@@ -0,0 +1,82 @@
+"""Accuracy and latency of the batch forecasters against statsmodels ARIMA.
+
+Holds out the last ``--horizon`` points of every series, forecasts them with
+each method and prints MAPE, RMSE and wall time per method. Series come from
+``DASHBOARD_DATA_PATH`` (or the demo data), optionally padded with
+``--synthetic`` random series shaped like the demo data.
+
+    python benchmarks/compare_forecasters.py --synthetic 2000
+"""
+import argparse
+import os
+import sys
+import time
+import warnings
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import batch_forecast  # noqa: E402
+import data_loader  # noqa: E402
+from forecasting import DEFAULT_ORDER, predict_future_values  # noqa: E402
+
+
+def load_series(synthetic, seed):
+    np.random.seed(42)
+    sales_data = data_loader.load_sales_data(os.environ.get('DASHBOARD_DATA_PATH'))
+    rows = [sales_data[name].to_numpy(dtype='float64') for name in data_loader.coffee_type_columns(sales_data)]
+
+    if synthetic:
+        rng = np.random.default_rng(seed)
+        length = len(sales_data)
+        pattern = np.sin(np.linspace(0, 2 * np.pi, length)) * 0.3 + 0.7
+        trend = np.linspace(0.8, 1.2, length)
+        levels = rng.uniform(500, 8000, size=(synthetic, 1))
+        noise = rng.normal(1.0, 0.1, size=(synthetic, length))
+        rows.extend(levels * pattern * trend * noise)
+    return np.vstack(rows)
+
+
+def arima_forecast(series, periods):
+    return np.array([predict_future_values(row, periods, DEFAULT_ORDER) for row in series])
+
+
+def score(actual, forecast):
+    errors = forecast - actual
+    with np.errstate(divide='ignore', invalid='ignore'):
+        mape = np.nanmean(np.abs(errors) / np.abs(actual)) * 100
+    rmse = np.sqrt(np.mean(errors ** 2))
+    return mape, rmse
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--horizon', type=int, default=4)
+    parser.add_argument('--synthetic', type=int, default=0, help="extra random series to add")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--skip-arima', action='store_true', help="only time the batch methods")
+    args = parser.parse_args()
+    # statsmodels warns about starting parameters on short series
+    warnings.simplefilter('ignore')
+
+    series = load_series(args.synthetic, args.seed)
+    train, actual = series[:, :-args.horizon], series[:, -args.horizon:]
+
+    methods = {name: lambda train, periods, method=name: batch_forecast.batch_forecast(train, periods, method)[0]
+               for name in batch_forecast.METHODS}
+    if not args.skip_arima:
+        methods['arima'] = arima_forecast
+
+    print(f"{len(series)} series, {train.shape[1]} training points, horizon {args.horizon}")
+    print(f"{'method':<16}{'MAPE %':>10}{'RMSE':>12}{'seconds':>12}{'ms/series':>12}")
+    for name, forecaster in methods.items():
+        started = time.perf_counter()
+        forecast = forecaster(train, args.horizon)
+        elapsed = time.perf_counter() - started
+        mape, rmse = score(actual, forecast)
+        print(f"{name:<16}{mape:>10.2f}{rmse:>12.1f}{elapsed:>12.3f}{elapsed / len(series) * 1000:>12.3f}")
+
+
+if __name__ == '__main__':
+    main()
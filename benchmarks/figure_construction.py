@@ -0,0 +1,182 @@
+"""Per-figure construction time: plotly.express versus the ``figures`` factory.
+
+Builds each dashboard chart the way the views used to (px on the long-format
+frames, then ``update_layout``) and the way they do now (``go`` traces from
+cube arrays on the registered card template), and prints the median time and
+serialized size of both. ``--products`` pads the data with synthetic SKUs to
+see how the gap grows with the catalog.
+
+    python benchmarks/figure_construction.py --products 50 --repeat 30
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+import plotly.express as px
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import data_loader  # noqa: E402
+import figures  # noqa: E402
+from catalog import ProductCatalog  # noqa: E402
+from sales_cube import MEASURES, PRICE, UNITS, SalesCube  # noqa: E402
+
+BACKGROUND = '#FFFFFF'
+TEXT = '#4A3933'
+CARD_LAYOUT = dict(plot_bgcolor=BACKGROUND, paper_bgcolor=BACKGROUND, font=dict(color=TEXT, size=9),
+                   margin=dict(l=5, r=5, t=5, b=5))
+LEGEND = dict(orientation="h", yanchor="bottom", y=1.02, xanchor="right", x=1, font=dict(size=8))
+
+
+def load_cube(products, seed):
+    np.random.seed(42)
+    sales_data = data_loader.load_sales_data(os.environ.get('DASHBOARD_DATA_PATH'))
+    names = data_loader.coffee_type_columns(sales_data)
+    rng = np.random.default_rng(seed)
+    extra = {}
+    for position in range(max(products - len(names), 0)):
+        name = f'Blend {position + 1}'
+        extra[name] = rng.integers(500, 8000, size=len(sales_data))
+        extra[name + 'Price'] = rng.uniform(80, 200, size=len(sales_data)).round(2)
+    sales_data = pd.concat([sales_data, pd.DataFrame(extra, index=sales_data.index)], axis=1)
+    names = names + [name for name in extra if not name.endswith('Price')]
+    return SalesCube.from_sales_data(sales_data, names)
+
+
+def long_frame(cube, measure=UNITS):
+    """Long-format Year / Coffee Type / measure frame of all products, the px input the views used to build"""
+    block = cube.values[:, :, measure]
+    if measure == UNITS:
+        block = block.astype('int64')
+    return pd.DataFrame({
+        'Year': np.tile(cube.periods, len(cube.products)),
+        'Coffee Type': np.repeat(cube.products, len(cube.periods)),
+        MEASURES[measure]: block.T.ravel()
+    })
+
+
+def period_frame(cube, span=3):
+    """``SalesCube.period_means`` of all products in long format with a 'Period' label column"""
+    labels, means, products = cube.period_means('all', span)
+    return pd.DataFrame({
+        'Period': np.tile(labels, len(products)),
+        'Coffee Type': np.repeat(products, len(labels)),
+        'Sales': means.T.ravel()
+    })
+
+
+def express_figures(cube, colors):
+    years = cube.periods.tolist()
+    # Built once outside the timings, as the cube used to cache them
+    sales = long_frame(cube)
+    prices = long_frame(cube, PRICE)
+    periods = period_frame(cube)
+    summary = cube.summary('all')
+    yield 'sales line', lambda: px.line(
+        sales, x='Year', y='Sales', color='Coffee Type', color_discrete_map=colors, markers=True
+    ).update_layout(**CARD_LAYOUT, legend=LEGEND, height=150, hovermode="x unified",
+                    xaxis=dict(tickmode='array', tickvals=years, tickfont=dict(size=8)),
+                    yaxis=dict(tickfont=dict(size=8))
+                    ).update_traces(line=dict(width=2), marker=dict(size=4), hovertemplate='%{y:,.0f} cups')
+    yield 'share pie', lambda: px.pie(
+        summary['pie_data'], values='Sales', names='Type', hole=0.6, color='Type', color_discrete_map=colors
+    ).update_layout(**CARD_LAYOUT, height=165).update_traces(textposition='inside', textinfo='percent')
+    yield 'yearly bars', lambda: px.bar(
+        sales, x='Year', y='Sales', color='Coffee Type', barmode='group', color_discrete_map=colors
+    ).update_layout(**CARD_LAYOUT, legend=LEGEND, height=130, bargap=0.15, bargroupgap=0.05
+                    ).update_traces(hovertemplate='%{y:,.0f} cups')
+    yield 'heatmap', lambda: px.imshow(
+        np.random.uniform(0.8, 1.2, size=(7, 7)), color_continuous_scale=[BACKGROUND, TEXT]
+    ).update_layout(**CARD_LAYOUT, height=130)
+    yield 'price line', lambda: px.line(
+        prices, x='Year', y='Price', color='Coffee Type', color_discrete_map=colors,
+        markers=True
+    ).update_layout(**CARD_LAYOUT, legend=LEGEND, height=150).update_traces(line=dict(width=2), marker=dict(size=4))
+    yield 'period bars', lambda: px.bar(
+        periods, x='Period', y='Sales', color='Coffee Type', barmode='group',
+        color_discrete_map=colors
+    ).update_layout(**CARD_LAYOUT, legend=LEGEND, height=150, bargap=0.15, bargroupgap=0.05)
+    corr_x, corr_y = cube.price_response('all')
+    yield 'price scatter', lambda: px.scatter(
+        x=corr_x, y=corr_y, labels={"x": "Price (₱)", "y": "Sales (cups)"}
+    ).update_layout(**CARD_LAYOUT, height=130, showlegend=False)
+
+
+def factory_figures(cube, colors):
+    years = cube.periods.tolist()
+    units, products = cube.series('all')
+    summary = cube.summary('all')
+    yield 'sales line', lambda: figures.figure(
+        figures.lines(years, units.astype('int64'), products, colors, hovertemplate='%{y:,.0f} cups'),
+        legend=LEGEND, height=150, hovermode="x unified",
+        xaxis=dict(tickmode='array', tickvals=years, tickfont=dict(size=8))
+    )
+    yield 'share pie', lambda: figures.figure(
+        [figures.donut(summary['pie_data']['Type'], summary['pie_data']['Sales'], colors=colors,
+                       textposition='inside', textinfo='percent')],
+        height=165
+    )
+    yield 'yearly bars', lambda: figures.figure(
+        figures.bars(years, units.astype('int64'), products, colors, hovertemplate='%{y:,.0f} cups'),
+        legend=LEGEND, height=130, barmode='group', bargap=0.15, bargroupgap=0.05
+    )
+
+    def heatmap():
+        trace, layout = figures.heatmap(np.random.uniform(0.8, 1.2, size=(7, 7)), None, None, [BACKGROUND, TEXT])
+        return figures.figure([trace], height=130, **layout)
+    yield 'heatmap', heatmap
+    yield 'price line', lambda: figures.figure(
+        figures.lines(years, cube.series('all', PRICE)[0], products, colors), legend=LEGEND, height=150
+    )
+
+    def period_bars():
+        labels, means, period_products = cube.period_means('all')
+        return figures.figure(figures.bars(labels, means, period_products, colors), legend=LEGEND, height=150,
+                              barmode='group', bargap=0.15, bargroupgap=0.05)
+    yield 'period bars', period_bars
+    corr_x, corr_y = cube.price_response('all')
+    yield 'price scatter', lambda: figures.figure(
+        [figures.scatter(corr_x, corr_y, TEXT)], height=130, showlegend=False,
+        xaxis=dict(title=dict(text="Price (₱)")), yaxis=dict(title=dict(text="Sales (cups)"))
+    )
+
+
+def measure(build, repeat):
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fig = build()
+        timings.append(time.perf_counter() - started)
+    return statistics.median(timings), len(fig.to_json())
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--products', type=int, default=0, help="pad the catalog to this many products")
+    parser.add_argument('--repeat', type=int, default=20)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    cube = load_cube(args.products, args.seed)
+    colors = ProductCatalog(cube.products).colors
+    figures.register_template(BACKGROUND, TEXT)
+
+    print(f"{len(cube.products)} products, {len(cube.periods)} periods, median of {args.repeat} builds")
+    print(f"{'figure':<14}{'px ms':>9}{'factory ms':>12}{'speed-up':>10}{'px kB':>9}{'factory kB':>12}")
+    totals = [0.0, 0.0]
+    for (name, express), (_, factory) in zip(express_figures(cube, colors), factory_figures(cube, colors)):
+        express_seconds, express_bytes = measure(express, args.repeat)
+        factory_seconds, factory_bytes = measure(factory, args.repeat)
+        totals[0] += express_seconds
+        totals[1] += factory_seconds
+        print(f"{name:<14}{express_seconds * 1000:>9.2f}{factory_seconds * 1000:>12.2f}"
+              f"{express_seconds / factory_seconds:>9.1f}x{express_bytes / 1024:>9.1f}{factory_bytes / 1024:>12.1f}")
+    print(f"{'total':<14}{totals[0] * 1000:>9.2f}{totals[1] * 1000:>12.2f}{totals[0] / totals[1]:>9.1f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,73 @@
+"""Import-time breakdown and time to first request for ``app``.
+
+Starts a fresh interpreter the way a new server worker would, with
+``-X importtime``, and reports which packages the import of ``app`` spends
+its time in, the wall time of the whole import (including ``app``'s own
+module body: data load, cube, cached forecasts), and how long the first page
+and layout requests take afterwards.
+
+    python benchmarks/startup_report.py --top 15
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+from collections import defaultdict
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+PROBE = '''
+import json, time
+started = time.perf_counter()
+import app
+imported = time.perf_counter()
+client = app.server.test_client()
+client.get('/')
+page = time.perf_counter()
+client.get('/_dash-layout')
+layout = time.perf_counter()
+print(json.dumps({'import': imported - started, 'page': page - imported, 'layout': layout - page}))
+'''
+
+
+def parse_importtime(stderr):
+    """``{module: (self_us, cumulative_us)}`` from ``-X importtime`` output"""
+    modules = {}
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, cumulative_us, name = line[len('import time:'):].split('|')
+        modules[name.strip()] = (int(self_us), int(cumulative_us))
+    return modules
+
+
+def by_package(modules):
+    totals = defaultdict(int)
+    for name, (self_us, _) in modules.items():
+        totals[name.split('.')[0]] += self_us
+    return sorted(totals.items(), key=lambda item: item[1], reverse=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--top', type=int, default=12, help="packages to list")
+    args = parser.parse_args()
+
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c', PROBE], cwd=ROOT, capture_output=True,
+                            text=True, check=True)
+    timings = json.loads(result.stdout.strip().splitlines()[-1])
+    modules = parse_importtime(result.stderr)
+
+    print(f"{'package':<28}{'self ms':>10}")
+    for package, self_us in by_package(modules)[:args.top]:
+        print(f"{package:<28}{self_us / 1000:>10.1f}")
+    print()
+    print(f"import app           {timings['import'] * 1000:8.1f} ms")
+    print(f"first page request   {timings['page'] * 1000:8.1f} ms")
+    print(f"first layout request {timings['layout'] * 1000:8.1f} ms")
+    print(f"time to first layout {sum(timings.values()) * 1000:8.1f} ms")
+
+
+if __name__ == '__main__':
+    main()
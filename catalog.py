@@ -0,0 +1,93 @@
+"""Product registry for the dashboard.
+
+The sidebar filters, chart colours and per-product series are all generated
+from the catalog, so adding a SKU to the source data is enough to make it
+show up everywhere. Lookups by name or by filter slug are single dict hits.
+"""
+import colorsys
+import re
+from collections import namedtuple
+
+Product = namedtuple('Product', ['name', 'slug', 'color'])
+
+# Earth tones that sit well on the cream background, used in order for
+# products without a fixed colour before falling back to generated shades.
+PALETTE = [
+    '#8B4513',  # SaddleBrown
+    '#A67B5B',  # Café au lait
+    '#8B7355',  # Burlywood4
+    '#6F4E37',  # Coffee
+    '#B5651D',  # Light brown
+    '#C19A6B',  # Camel
+    '#4B3621',  # Café noir
+    '#967117',  # Sandy taupe
+    '#80461B',  # Russet
+    '#E1C699',  # Tan
+]
+
+
+def slugify(name):
+    return re.sub(r'[^a-z0-9]+', '-', name.lower()).strip('-') or 'product'
+
+
+def _generated_color(position):
+    # Walk the hue range of browns/ambers with a golden-ratio step so
+    # neighbouring products stay distinguishable for any catalog size.
+    hue = 0.05 + (position * 0.618033988749895 % 1.0) * 0.08
+    lightness = 0.30 + (position * 0.381966011250105 % 1.0) * 0.40
+    red, green, blue = colorsys.hls_to_rgb(hue, lightness, 0.45)
+    return '#{:02X}{:02X}{:02X}'.format(int(red * 255), int(green * 255), int(blue * 255))
+
+
+def with_alpha(color, alpha):
+    """``#RRGGBB`` as an ``rgba()`` string, e.g. for translucent forecast bands"""
+    red, green, blue = (int(color[position:position + 2], 16) for position in (1, 3, 5))
+    return f'rgba({red}, {green}, {blue}, {alpha})'
+
+
+class ProductCatalog:
+    def __init__(self, names, fixed_colors=None):
+        fixed_colors = fixed_colors or {}
+        self.products = []
+        self.by_name = {}
+        self.by_slug = {}
+
+        palette_position = 0
+        for name in names:
+            color = fixed_colors.get(name)
+            if color is None:
+                if palette_position < len(PALETTE):
+                    color = PALETTE[palette_position]
+                else:
+                    color = _generated_color(palette_position)
+                palette_position += 1
+
+            slug = slugify(name)
+            while slug in self.by_slug:
+                slug += '-'
+            product = Product(name, slug, color)
+
+            self.products.append(product)
+            self.by_name[name] = product
+            self.by_slug[slug] = product
+
+        self.names = [product.name for product in self.products]
+        self.colors = {product.name: product.color for product in self.products}
+
+    def __iter__(self):
+        return iter(self.products)
+
+    def __len__(self):
+        return len(self.products)
+
+    def __contains__(self, name):
+        return name in self.by_name
+
+    def color(self, name, default=None):
+        product = self.by_name.get(name)
+        return product.color if product else default
+
+    def select(self, coffee_filter):
+        """Products covered by a filter value: every product for 'all', otherwise the one named"""
+        product = self.by_name.get(coffee_filter)
+        return [product] if product else self.products
@@ -0,0 +1,171 @@
+"""Sales data loading for the dashboard.
+
+Point-of-sale transactions are streamed from CSV/Parquet files in fixed-size
+chunks and reduced to one row per year with a units column and an average
+price column per coffee type (the ``sales_data`` layout used by ``app.py``).
+Only the running Year x product aggregate is kept between chunks, so memory
+use depends on the chunk size and not on the size of the input.
+"""
+import glob
+import os
+
+import numpy as np
+import pandas as pd
+
+CHUNK_SIZE = 250_000
+
+# Column names expected in the transaction files, one row per line item.
+# A ``year`` column may be supplied instead of ``date`` to skip date parsing.
+DATE_COLUMN = 'date'
+YEAR_COLUMN = 'year'
+PRODUCT_COLUMN = 'product'
+QUANTITY_COLUMN = 'quantity'
+PRICE_COLUMN = 'unit_price'
+
+# Re-reduce the collected per-chunk aggregates once this many have piled up.
+_COMPACT_EVERY = 32
+
+
+def synthetic_sales_data():
+    """Yearly demo data used when no transaction files are configured"""
+    years = list(range(2014, 2026))  # 2014 to 2025
+
+    base_pattern = np.sin(np.linspace(0, 2 * np.pi, 12)) * 0.3 + 0.7
+    growth_trend = np.linspace(0.8, 1.2, 12)
+
+    espresso_sales = (np.random.normal(5000, 500, 12) * base_pattern * growth_trend).astype(int)
+    latte_sales = (np.random.normal(5500, 450, 12) * base_pattern * growth_trend).astype(int)
+    cappuccino_sales = (np.random.normal(4500, 400, 12) * (base_pattern[::-1] * growth_trend)).astype(int)
+
+    espresso_prices = np.round(np.random.normal(80.5, 2.5, 12) * (growth_trend * 0.2 + 0.9), 2)
+    latte_prices = np.round(np.random.normal(60.5, 2.0, 12) * (growth_trend * 0.2 + 0.9), 2)
+    cappuccino_prices = np.round(np.random.normal(75.2, 2.2, 12) * (growth_trend * 0.2 + 0.9), 2)
+
+    sales_data = pd.DataFrame({
+        'Year': years,
+        'Espresso': espresso_sales,
+        'Latte': latte_sales,
+        'Cappuccino': cappuccino_sales,
+        'EspressoPrice': espresso_prices,
+        'LattePrice': latte_prices,
+        'CappuccinoPrice': cappuccino_prices
+    })
+
+    return add_totals(sales_data, ['Espresso', 'Latte', 'Cappuccino'])
+
+
+def add_totals(sales_data, coffee_types):
+    sales_data['Total'] = sales_data[coffee_types].sum(axis=1)
+    sales_data['Revenue'] = sum(sales_data[name] * sales_data[name + 'Price'] for name in coffee_types)
+    return sales_data
+
+
+def coffee_type_columns(sales_data):
+    """Product names of a ``sales_data`` frame, in column order"""
+    return [column for column in sales_data.columns
+            if column not in ('Year', 'Total', 'Revenue') and not column.endswith('Price')]
+
+
+def find_transaction_files(path):
+    """Expand a file, directory or glob pattern into a sorted list of data files"""
+    if os.path.isdir(path):
+        pattern = os.path.join(path, '*')
+    else:
+        pattern = path
+    files = [name for name in glob.glob(pattern)
+             if name.lower().endswith(('.csv', '.csv.gz', '.parquet', '.pq'))]
+    if not files:
+        raise FileNotFoundError(f"No CSV or Parquet transaction files found at {path!r}")
+    return sorted(files)
+
+
+def iter_transaction_chunks(path, chunk_size=CHUNK_SIZE):
+    """Yield the line items of one CSV/Parquet file as DataFrames of at most ``chunk_size`` rows"""
+    if path.lower().endswith(('.parquet', '.pq')):
+        try:
+            import pyarrow.parquet as pq
+        except ImportError as exc:
+            raise ImportError("Reading Parquet transaction files requires pyarrow") from exc
+
+        parquet_file = pq.ParquetFile(path)
+        names = parquet_file.schema_arrow.names
+        columns = [column for column in (DATE_COLUMN, YEAR_COLUMN, PRODUCT_COLUMN,
+                                         QUANTITY_COLUMN, PRICE_COLUMN) if column in names]
+        for batch in parquet_file.iter_batches(batch_size=chunk_size, columns=columns):
+            yield batch.to_pandas()
+    else:
+        header = pd.read_csv(path, nrows=0).columns
+        columns = [column for column in (DATE_COLUMN, YEAR_COLUMN, PRODUCT_COLUMN,
+                                         QUANTITY_COLUMN, PRICE_COLUMN) if column in header]
+        yield from pd.read_csv(
+            path,
+            usecols=columns,
+            dtype={PRODUCT_COLUMN: 'category', QUANTITY_COLUMN: 'float64', PRICE_COLUMN: 'float64'},
+            chunksize=chunk_size
+        )
+
+
+def aggregate_chunk(chunk):
+    """Reduce one chunk of line items to units and revenue per (Year, product)"""
+    if YEAR_COLUMN in chunk.columns:
+        year = chunk[YEAR_COLUMN].astype('int64')
+    else:
+        year = pd.to_datetime(chunk[DATE_COLUMN]).dt.year
+
+    quantity = chunk[QUANTITY_COLUMN].to_numpy(dtype='float64')
+    reduced = pd.DataFrame({
+        'Year': year.to_numpy(),
+        'Product': chunk[PRODUCT_COLUMN].astype(str).to_numpy(),
+        'Units': quantity,
+        'Revenue': quantity * chunk[PRICE_COLUMN].to_numpy(dtype='float64')
+    })
+    return reduced.groupby(['Year', 'Product'], sort=False).sum()
+
+
+def _combine(partials):
+    return pd.concat(partials).groupby(level=['Year', 'Product'], sort=False).sum()
+
+
+def load_transactions(path, chunk_size=CHUNK_SIZE):
+    """Stream every transaction file under ``path`` into a yearly ``sales_data`` frame.
+
+    Units are summed per year and product, prices are the revenue-weighted
+    average unit price, and ``Total``/``Revenue`` are added as in the demo data.
+    Products are ordered by total units sold, best seller first.
+    """
+    partials = []
+    for file_name in find_transaction_files(path):
+        for chunk in iter_transaction_chunks(file_name, chunk_size):
+            if len(chunk):
+                partials.append(aggregate_chunk(chunk))
+            if len(partials) >= _COMPACT_EVERY:
+                partials = [_combine(partials)]
+
+    if not partials:
+        raise ValueError(f"Transaction files at {path!r} contain no line items")
+
+    totals = _combine(partials)
+    units = totals['Units'].unstack('Product', fill_value=0).sort_index()
+    revenue = totals['Revenue'].unstack('Product', fill_value=0).sort_index()
+
+    coffee_types = units.sum().sort_values(ascending=False, kind='stable').index.tolist()
+    units = units[coffee_types]
+    revenue = revenue[coffee_types]
+    prices = (revenue / units.where(units > 0)).round(2)
+
+    sales_data = pd.DataFrame({'Year': units.index.astype(int)})
+    for name in coffee_types:
+        sales_data[name] = units[name].round().astype('int64').to_numpy()
+    for name in coffee_types:
+        sales_data[name + 'Price'] = prices[name].to_numpy()
+
+    sales_data['Total'] = sales_data[coffee_types].sum(axis=1)
+    sales_data['Revenue'] = revenue.sum(axis=1).round(2).to_numpy()
+    return sales_data
+
+
+def load_sales_data(path=None, chunk_size=CHUNK_SIZE):
+    """``sales_data`` from the transaction files at ``path``, or the demo data when unset"""
+    if not path:
+        return synthetic_sales_data()
+    return load_transactions(path, chunk_size)
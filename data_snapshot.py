@@ -0,0 +1,83 @@
+"""The data the dashboard views render from, as one swappable object.
+
+A ``DataSnapshot`` bundles the sales cube, the product catalog and the
+forecasts with what is derived from them (forecast KPIs, prediction years).
+New data or forecasts produce a new snapshot that replaces the old one by
+rebinding a single reference. Each callback takes the current snapshot once
+when it starts, so a render in flight finishes on the data it began with.
+
+``to_shared`` and ``from_shared`` convert a snapshot to and from the arrays
+and meta that ``shared_store`` publishes between processes.
+"""
+import numpy as np
+
+import data_loader
+from catalog import ProductCatalog
+from forecast_summary import build_kpi_table
+from forecasting import HORIZON
+from sales_cube import UNITS, SalesCube
+
+FORECAST_KEYS = ('forecast', 'lower', 'upper')
+
+
+def load_cube(path=None):
+    """Sales cube of the transaction files at ``path``, or of the demo data when unset"""
+    sales_data = data_loader.load_sales_data(path)
+    return SalesCube.from_sales_data(sales_data, data_loader.coffee_type_columns(sales_data))
+
+
+def unit_series(cube):
+    """Yearly units per product, the input of ``ForecastStore``"""
+    return {name: cube.values[:, position, UNITS] for position, name in enumerate(cube.products)}
+
+
+class DataSnapshot:
+    def __init__(self, cube, forecasts=None, forecasts_ready=False, forecast_version=0, fixed_colors=None,
+                 horizon=HORIZON):
+        self.cube = cube
+        self.catalog = ProductCatalog(cube.products, fixed_colors=fixed_colors)
+        self.forecasts = dict(forecasts or {})
+        self.forecasts_ready = forecasts_ready
+        self.forecast_version = forecast_version
+        self.years = cube.periods.tolist()
+        self.future_years = [self.years[-1] + step for step in range(1, horizon + 1)]
+        self.prediction_years = self.years + self.future_years
+        # Revenue KPIs of the predictions view per filter
+        self.forecast_kpis = build_kpi_table(cube, self.forecasts, forecasts_ready)
+        # Keys rendered views; changes with the data and with every forecast publish
+        self.version = f'{cube.version}-{forecast_version}'
+
+    def history(self, name):
+        """Yearly units sold of product ``name``"""
+        return self.cube.values[:, self.cube.index[name], UNITS]
+
+
+def to_shared(cube, forecasts, forecasts_ready, forecast_version, horizon=HORIZON):
+    """``(arrays, meta)`` for ``SharedSnapshotStore.publish``; forecasts become NaN-padded product x horizon arrays"""
+    arrays = {'periods': np.asarray(cube.periods, dtype='int64'), 'values': cube.values}
+    for key in FORECAST_KEYS:
+        block = np.full((len(cube.products), horizon), np.nan)
+        for position, name in enumerate(cube.products):
+            entry = forecasts.get(name)
+            if entry is not None and len(entry[key]) == horizon:
+                block[position] = entry[key]
+        arrays[key] = block
+    meta = {
+        'products': cube.products,
+        'forecasted': [name for name in cube.products if name in forecasts],
+        'forecasts_ready': forecasts_ready,
+        'forecast_version': forecast_version
+    }
+    return arrays, meta
+
+
+def from_shared(shared, fixed_colors=None):
+    """``DataSnapshot`` over the arrays of a ``shared_store.Snapshot``, without copying them"""
+    arrays, meta = shared.arrays, shared.meta
+    cube = SalesCube(arrays['periods'], meta['products'], arrays['values'])
+    forecasts = {}
+    for name in meta['forecasted']:
+        position = cube.index[name]
+        forecasts[name] = {key: arrays[key][position] for key in FORECAST_KEYS}
+    return DataSnapshot(cube, forecasts, meta['forecasts_ready'], meta['forecast_version'], fixed_colors,
+                        arrays['forecast'].shape[1])
@@ -0,0 +1,87 @@
+"""Picks up new or changed transaction files without a restart.
+
+``DataWatcher`` stats the files at ``DASHBOARD_DATA_PATH`` every
+``DASHBOARD_WATCH_INTERVAL`` seconds (default 30, 0 turns watching off) on a
+daemon thread. A change is a file added or removed, or a file whose size or
+modification time changed. Once a change has stayed the same for a whole
+interval, the watcher calls its callback. Waiting that interval means an
+extract that is still being copied in is never read half-written. Polling
+the file metadata needs no extra dependency and costs one ``stat`` per file.
+"""
+import logging
+import os
+import threading
+
+import data_loader
+
+logger = logging.getLogger(__name__)
+
+WATCH_INTERVAL = float(os.environ.get('DASHBOARD_WATCH_INTERVAL', 30))
+
+
+def file_signature(path):
+    """``{file: (size, mtime_ns)}`` of the transaction files at ``path``, empty when there are none"""
+    try:
+        files = data_loader.find_transaction_files(path)
+    except FileNotFoundError:
+        return {}
+    signature = {}
+    for name in files:
+        try:
+            stat = os.stat(name)
+        except FileNotFoundError:
+            continue
+        signature[name] = (stat.st_size, stat.st_mtime_ns)
+    return signature
+
+
+class DataWatcher:
+    def __init__(self, path, on_change, interval=WATCH_INTERVAL):
+        self.path = path
+        self.on_change = on_change
+        self.interval = interval
+        self.signature = file_signature(path)
+        self.reloads = 0
+        self.failures = 0
+        self._pending = None
+        self._stop = threading.Event()
+        self._thread = None
+
+    def poll(self):
+        """Check the files once; calls ``on_change`` and returns True for a change that has settled"""
+        signature = file_signature(self.path)
+        if signature == self.signature:
+            self._pending = None
+            return False
+        if signature != self._pending:
+            # New, or still changing since the last poll: look again after another interval
+            self._pending = signature
+            return False
+
+        changed = [name for name in set(signature) | set(self.signature)
+                   if signature.get(name) != self.signature.get(name)]
+        logger.info("%d transaction files at %s changed, reloading", len(changed), self.path)
+        # Recorded first so a file that fails to load is not retried until it changes again
+        self.signature = signature
+        self._pending = None
+        try:
+            self.on_change()
+        except Exception:
+            self.failures += 1
+            logger.exception("Reloading %s failed; keeping the current data", self.path)
+            return False
+        self.reloads += 1
+        return True
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self.poll()
+
+    def start(self):
+        if self.interval > 0 and self._thread is None:
+            self._thread = threading.Thread(target=self._run, name='data-watcher', daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
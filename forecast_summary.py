@@ -0,0 +1,63 @@
+"""Revenue KPIs derived from the forecasts, tabulated per dashboard filter.
+
+``build_kpi_table`` is run whenever the ``ForecastStore`` publishes new
+forecasts, so the predictions view only does a dict lookup. Forecast units
+are priced at each product's latest known price.
+"""
+import numpy as np
+
+from sales_cube import ALL, PRICE, REVENUE
+
+
+def latest_prices(cube):
+    """Last non-missing price of every product (0 for products never priced)"""
+    prices = cube.values[:, :, PRICE]
+    known = ~np.isnan(prices)
+    last = known.shape[0] - 1 - np.argmax(known[::-1], axis=0)
+    return np.where(known.any(axis=0), prices[last, np.arange(prices.shape[1])], 0.0)
+
+
+def kpis(history, forecast):
+    """``(current_total, forecasted_total, growth_rate)`` from yearly revenue arrays.
+
+    The growth rate is the compound yearly growth in percent from the last
+    actual year to the last forecast year; forecast values are None while any
+    product in the selection is still being fitted.
+    """
+    current_total = float(history.sum())
+    if not len(forecast) or np.isnan(forecast).any():
+        return current_total, None, None
+    growth_rate = None
+    if history[-1] > 0 and forecast[-1] > 0:
+        growth_rate = round(float((forecast[-1] / history[-1]) ** (1 / len(forecast)) - 1) * 100, 1)
+    return current_total, float(forecast.sum()), growth_rate
+
+
+def build_kpi_table(cube, forecasts, ready=False):
+    """Map every filter ('all' and each product) to its ``kpis`` tuple plus the number of products left out.
+
+    Once the fits are ``ready``, a product without a forecast failed to fit and will not get one: it is left
+    out of the 'all' totals (history and forecast alike, so the growth rate compares the same products) and
+    counted as excluded, instead of keeping the row pending for good.
+    """
+    horizon = max((len(forecasts[name]['forecast']) for name in cube.products if name in forecasts), default=0)
+    units = np.full((horizon, len(cube.products)), np.nan)
+    for position, name in enumerate(cube.products):
+        entry = forecasts.get(name)
+        if entry is not None and len(entry['forecast']) == horizon:
+            units[:, position] = entry['forecast']
+
+    revenue = cube.values[:, :, REVENUE]
+    forecast_revenue = np.clip(units, 0, None) * latest_prices(cube)
+    included = np.ones(len(cube.products), dtype=bool)
+    if ready:
+        included = ~np.isnan(units).any(axis=0) if horizon else ~included
+    excluded = int((~included).sum())
+    if excluded == len(cube.products):
+        table = {ALL: kpis(revenue.sum(axis=1), np.array([])) + (excluded,)}
+    else:
+        table = {ALL: kpis(revenue[:, included].sum(axis=1), forecast_revenue[:, included].sum(axis=1))
+                 + (excluded,)}
+    for position, name in enumerate(cube.products):
+        table[name] = kpis(revenue[:, position], forecast_revenue[:, position]) + (int(not included[position]),)
+    return table
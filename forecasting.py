@@ -0,0 +1,426 @@
+"""Sales forecasts for the predictions view.
+
+Fitting is kept off the import path: ``ForecastStore.start`` loads whatever is
+already in the on-disk cache and fits the rest on a background thread, so the
+dashboard can serve the historical series straight away. Cache entries are
+keyed by a hash of the input series together with the model order and the
+horizon, so a restart with unchanged data never refits.
+
+The per-series fits are spread over a process pool (``DASHBOARD_FORECAST_WORKERS``,
+default one worker per CPU); a failing series is logged and skipped without
+affecting the others. Setting ``DASHBOARD_FORECAST_METHOD`` to one of the
+``batch_forecast`` methods ('ar1', 'holt', 'seasonal_naive') replaces the
+per-series ARIMA fits with a single vectorised fit over all series.
+``DASHBOARD_FORECAST_ORDER=auto`` picks each series' ARIMA order by AIC (see
+``order_selection``) instead of using a fixed ``p,d,q``.
+
+The fitted ARIMA parameters of every series are kept in a small memo next to
+the cache. ``ForecastStore.refresh`` swaps in new data and refits only the
+series whose values changed, starting the optimiser from those parameters.
+"""
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
+
+import numpy as np
+
+import batch_forecast
+import order_selection
+from order_selection import AUTO
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_ORDER = (1, 0, 0)
+HORIZON = 4
+# Prediction intervals are stored at this level (0.05 -> 95% bands)
+INTERVAL_ALPHA = 0.05
+ARIMA = 'arima'
+FORECAST_METHOD = os.environ.get('DASHBOARD_FORECAST_METHOD', ARIMA)
+FORECAST_WORKERS = int(os.environ.get('DASHBOARD_FORECAST_WORKERS', 0)) or os.cpu_count() or 1
+FORECAST_ORDER = os.environ.get('DASHBOARD_FORECAST_ORDER', ','.join(map(str, DEFAULT_ORDER)))
+CACHE_DIR = os.environ.get(
+    'DASHBOARD_CACHE_DIR',
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), '.cache')
+)
+
+
+def predict_future_values(data, periods=HORIZON, order=DEFAULT_ORDER):
+    return forecast_with_intervals(data, periods, order)['forecast']
+
+
+def forecast_with_intervals(data, periods=HORIZON, order=DEFAULT_ORDER, alpha=INTERVAL_ALPHA, start_params=None):
+    """Point forecast plus the ``1 - alpha`` prediction interval as a cache entry.
+
+    ``start_params`` warm-starts the optimiser, e.g. from the previous fit of
+    the same series before new periods were appended.
+    """
+    # statsmodels takes over a second to import, so only pay for it when fitting
+    from statsmodels.tsa.arima.model import ARIMA
+
+    model = ARIMA(np.asarray(data, dtype='float64'), order=order)
+    model_fit = model.fit(start_params=None if start_params is None else np.asarray(start_params, dtype='float64'))
+    return forecast_entry(model_fit, periods, alpha)
+
+
+def forecast_entry(model_fit, periods, alpha=INTERVAL_ALPHA):
+    prediction = model_fit.get_forecast(steps=periods)
+    bounds = np.asarray(prediction.conf_int(alpha=alpha))
+    return {
+        'forecast': np.asarray(prediction.predicted_mean, dtype='float64').tolist(),
+        'lower': bounds[:, 0].tolist(),
+        'upper': bounds[:, 1].tolist(),
+        'params': np.asarray(model_fit.params, dtype='float64').tolist()
+    }
+
+
+def parse_order(value):
+    """'auto' or a 'p,d,q' string (or tuple) as accepted by ``ForecastStore``"""
+    if value == AUTO:
+        return AUTO
+    if isinstance(value, str):
+        value = value.split(',')
+    return tuple(int(part) for part in value)
+
+
+def fit_series(name, data, periods=HORIZON, order=DEFAULT_ORDER, start_params=None):
+    """Fit one series and return ``(name, entry, seconds, error)``; runs inside pool workers"""
+    started = time.perf_counter()
+    try:
+        entry = forecast_with_intervals(data, periods, order, start_params=start_params)
+        error = None
+    except Exception as exc:
+        entry = None
+        error = f"{type(exc).__name__}: {exc}"
+    return name, entry, time.perf_counter() - started, error
+
+
+def cache_key(data, order=DEFAULT_ORDER, periods=HORIZON, method=ARIMA):
+    digest = hashlib.sha256()
+    digest.update(np.ascontiguousarray(data, dtype='float64').tobytes())
+    digest.update(repr((method, tuple(order), int(periods), INTERVAL_ALPHA)).encode())
+    return digest.hexdigest()
+
+
+def write_json(path, value):
+    """Write ``value`` as JSON to ``path`` through a temporary file, so readers never see a partial file"""
+    directory = os.path.dirname(path)
+    os.makedirs(directory, exist_ok=True)
+    handle, temp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+    try:
+        with os.fdopen(handle, 'w', encoding='utf-8') as temp_file:
+            json.dump(value, temp_file)
+        os.replace(temp_path, path)
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+
+
+class ForecastCache:
+    """One small JSON file per cache key under ``directory``"""
+
+    def __init__(self, directory=CACHE_DIR):
+        self.root = directory
+        self.directory = os.path.join(directory, 'forecasts')
+
+    def _path(self, key):
+        return os.path.join(self.directory, key + '.json')
+
+    def get(self, key):
+        try:
+            with open(self._path(key), encoding='utf-8') as handle:
+                return json.load(handle)
+        except (OSError, ValueError):
+            return None
+
+    def put(self, key, entry):
+        try:
+            write_json(self._path(key), entry)
+        except OSError:
+            logger.warning("Could not write forecast cache entry %s", key, exc_info=True)
+
+
+class ParamsMemo:
+    """Last fitted ARIMA parameters per series name, persisted as one JSON file"""
+
+    def __init__(self, directory):
+        self.path = os.path.join(directory, 'arima_params.json')
+        try:
+            with open(self.path, encoding='utf-8') as handle:
+                self.entries = json.load(handle)
+        except (OSError, ValueError):
+            self.entries = {}
+
+    def get(self, name, order):
+        """Parameters of the last fit of ``name`` if it used ``order``, else None"""
+        entry = self.entries.get(name)
+        if entry is None or tuple(entry['order']) != tuple(order):
+            return None
+        return entry['params']
+
+    def put(self, name, order, params):
+        self.entries[name] = {'order': list(order), 'params': [float(value) for value in params]}
+
+    def save(self):
+        try:
+            write_json(self.path, self.entries)
+        except OSError:
+            logger.warning("Could not save ARIMA parameter memo to %s", self.path, exc_info=True)
+
+
+class ForecastStore:
+    """Forecasts for a set of named series, loaded from cache or fitted in the background"""
+
+    def __init__(self, series_by_name, periods=HORIZON, order=FORECAST_ORDER, cache=None, workers=FORECAST_WORKERS,
+                 method=FORECAST_METHOD):
+        if method != ARIMA and method not in batch_forecast.METHODS:
+            raise ValueError(f"Unknown forecast method {method!r}")
+        self.series = {name: np.asarray(values, dtype='float64') for name, values in series_by_name.items()}
+        self.periods = periods
+        self.order = parse_order(order)
+        self.method = method
+        self.cache = cache if cache is not None else ForecastCache()
+        self.workers = workers
+        self.memo = order_selection.OrderMemo(self.cache.root) if self.auto_order else None
+        self.params = ParamsMemo(self.cache.root)
+        self.orders = {}
+        self.forecasts = {}
+        self.timings = {}
+        self.errors = {}
+        # Bumped every time a batch of forecasts lands; subscribers are called with the store
+        self.version = 0
+        self._subscribers = []
+        self._done = threading.Event()
+        self._thread = None
+        self._refresh_lock = threading.Lock()
+
+    @property
+    def auto_order(self):
+        return self.method == ARIMA and self.order == AUTO
+
+    @property
+    def ready(self):
+        return self._done.is_set()
+
+    def order_for(self, name):
+        """ARIMA order used for ``name``: the selected one in auto mode, otherwise the configured order"""
+        if self.order == AUTO:
+            return self.orders.get(name, DEFAULT_ORDER)
+        return self.order
+
+    def _key(self, name):
+        return cache_key(self.series[name], self.order_for(name), self.periods, self.method)
+
+    def progress(self):
+        """``(done, total)`` series fitted or failed so far; counts each fit as it lands, before it is published"""
+        series = self.series
+        return sum(name in self.forecasts or name in self.errors for name in series), len(series)
+
+    def get(self, name):
+        """``{'forecast', 'lower', 'upper'}`` value lists for ``name``, or None while it is still being fitted"""
+        return self.forecasts.get(name)
+
+    def wait(self, timeout=None):
+        """Block until the forecasts are fitted and subscribers have been told; False on timeout"""
+        if not self._done.wait(timeout):
+            return False
+        thread = self._thread
+        if thread is not None and thread is not threading.current_thread():
+            thread.join(timeout)
+        return True
+
+    def load_cached(self, names=None):
+        """Fill in every forecast already on disk and return the names that still need a fit"""
+        names = list(self.series) if names is None else names
+        if self.auto_order:
+            for name in names:
+                entry = self.memo.get(name)
+                if not order_selection.needs_search(entry, self.series[name]):
+                    self.orders[name] = tuple(entry['order'])
+
+        missing = []
+        for name in names:
+            entry = None
+            if not self.auto_order or name in self.orders:
+                entry = self.cache.get(self._key(name))
+            if entry is None or 'lower' not in entry:
+                missing.append(name)
+            else:
+                self.forecasts[name] = entry
+        return missing
+
+    def _record(self, name, entry, seconds, error):
+        self.timings[name] = seconds
+        if error is not None:
+            self.errors[name] = error
+            logger.warning("Forecast fit failed for %s after %.3fs: %s", name, seconds, error)
+            return
+        logger.debug("Fitted forecast for %s in %.3fs", name, seconds)
+        params = entry.pop('params', None)
+        if params is not None:
+            self.params.put(name, self.order_for(name), params)
+        self.cache.put(self._key(name), entry)
+        self.forecasts[name] = entry
+
+    def _map(self, function, tasks):
+        """Run ``function(*task)`` for every task on the process pool, yielding results as they complete"""
+        if self.workers <= 1 or len(tasks) <= 1:
+            for task in tasks:
+                yield function(*task)
+            return
+
+        remaining = dict(enumerate(tasks))
+        try:
+            with ProcessPoolExecutor(max_workers=min(self.workers, len(tasks))) as executor:
+                futures = {executor.submit(function, *task): index for index, task in remaining.items()}
+                for future in as_completed(futures):
+                    result = future.result()
+                    del remaining[futures[future]]
+                    yield result
+        except BrokenProcessPool:
+            logger.exception("Forecast worker pool died, running %d remaining fits in-process", len(remaining))
+            for task in remaining.values():
+                yield function(*task)
+
+    def _fit_batch(self, names):
+        started = time.perf_counter()
+        try:
+            forecast, lower, upper = batch_forecast.batch_forecast(
+                np.vstack([self.series[name] for name in names]), self.periods, self.method, INTERVAL_ALPHA
+            )
+            entries = [
+                {'forecast': forecast[row].tolist(), 'lower': lower[row].tolist(), 'upper': upper[row].tolist()}
+                for row in range(len(names))
+            ]
+            error = None
+        except Exception as exc:
+            entries = [None] * len(names)
+            error = f"{type(exc).__name__}: {exc}"
+        # One fit covers every series, so each is charged an equal share of it
+        seconds = (time.perf_counter() - started) / len(names)
+        for name, entry in zip(names, entries):
+            self._record(name, entry, seconds, error)
+
+    def _search_orders(self, names):
+        """Grid-search the ARIMA order of each series by AIC; the winning fit also supplies the forecast"""
+        if not names:
+            return
+        candidates = order_selection.candidate_orders()
+        tasks = [(name, self.series[name], order, self.periods) for name in names for order in candidates]
+        seconds = dict.fromkeys(names, 0.0)
+        best = {}
+        for name, order, aic, entry, elapsed, error in self._map(order_selection.fit_candidate, tasks):
+            seconds[name] += elapsed
+            if entry is not None and (name not in best or aic < best[name][1]):
+                best[name] = (order, aic, entry)
+
+        for name in names:
+            if name not in best:
+                self._record(name, None, seconds[name], "no candidate ARIMA order could be fitted")
+                continue
+            order, aic, entry = best[name]
+            self.orders[name] = order
+            self.memo.put(name, order, aic, self.series[name])
+            self._record(name, entry, seconds[name], None)
+        self.memo.save()
+        logger.info("Searched %d ARIMA orders for %d series", len(candidates), len(names))
+
+    def fit(self, names):
+        started = time.perf_counter()
+        warm_started = 0
+        if self.method != ARIMA:
+            self._fit_batch(names)
+        else:
+            searched = []
+            if self.auto_order:
+                searched = [name for name in names if name not in self.orders]
+                self._search_orders(searched)
+            tasks = []
+            for name in names:
+                if name in searched:
+                    continue
+                start_params = self.params.get(name, self.order_for(name))
+                warm_started += start_params is not None
+                tasks.append((name, self.series[name], self.periods, self.order_for(name), start_params))
+            for result in self._map(fit_series, tasks):
+                self._record(*result)
+            self.params.save()
+
+        attempted = [name for name in names if name in self.timings]
+        failed = sum(name in self.errors for name in attempted)
+        logger.info(
+            "Fitted %d %s forecasts (%d warm-started) in %.2fs with %d workers (%.2fs total fit time, %d failed)",
+            len(attempted) - failed, self.method, warm_started, time.perf_counter() - started, self.workers,
+            sum(self.timings[name] for name in attempted), failed
+        )
+
+    def subscribe(self, callback):
+        """Call ``callback(store)`` whenever cached or newly fitted forecasts are published"""
+        self._subscribers.append(callback)
+        return callback
+
+    def _publish(self):
+        self.version += 1
+        for callback in self._subscribers:
+            try:
+                callback(self)
+            except Exception:
+                logger.exception("Forecast subscriber %r failed", callback)
+
+    def _run(self, names):
+        try:
+            self.fit(names)
+        finally:
+            # Set first so subscribers see ``ready``
+            self._done.set()
+            self._publish()
+
+    def _schedule(self, names, background):
+        missing = self.load_cached(names)
+        logger.info("Loaded %d cached forecasts, %d to fit", len(names) - len(missing), len(missing))
+        if not missing:
+            self._done.set()
+        self._publish()
+        if missing and background:
+            self._thread = threading.Thread(target=self._run, args=(missing,), name='forecast-fit', daemon=True)
+            self._thread.start()
+        elif missing:
+            self._run(missing)
+
+    def start(self, background=True):
+        """Load cached forecasts now and fit the missing ones, on a daemon thread unless ``background`` is False"""
+        self._schedule(list(self.series), background)
+        return self
+
+    def refresh(self, series_by_name, background=True):
+        """Swap in new data and refit only the series that are new or whose values changed.
+
+        Unchanged series keep their forecasts; changed ones are warm-started
+        from their last fitted parameters. Returns the changed names.
+        """
+        series = {name: np.asarray(values, dtype='float64') for name, values in series_by_name.items()}
+        with self._refresh_lock:
+            # A fit still running was started on the old data; let it land first
+            self._done.wait()
+            changed = [name for name, values in series.items()
+                       if name not in self.series or not np.array_equal(self.series[name], values)]
+            self.series = series
+            self.forecasts = {name: entry for name, entry in self.forecasts.items()
+                              if name in series and name not in changed}
+            for name in changed:
+                self.timings.pop(name, None)
+                self.errors.pop(name, None)
+                self.orders.pop(name, None)
+
+            logger.info("Forecast refresh: %d of %d series changed", len(changed), len(series))
+            if changed:
+                self._done.clear()
+                self._schedule(changed, background)
+            return changed
+
@@ -0,0 +1,30 @@
+"""Gunicorn deployment profile for the dashboard.
+
+The app is loaded once in the master (``preload_app``) through
+``wsgi:create_app()`` and the workers are forked from it, so data, forecasts
+and the warmed view cache are shared copy-on-write and adding a worker adds
+little memory. Sizes default to one worker per CPU with a few threads each;
+override them with DASHBOARD_WORKERS / DASHBOARD_THREADS / DASHBOARD_BIND.
+With DASHBOARD_SHARED_STORE set, the data comes from a ``refresher.py``
+process instead, and the workers pick up reloads without being restarted.
+That is the only way to reload changed data files under this profile: the
+refresher watches them and reloads once for every worker. Without a shared
+store, new files are read on the next restart.
+
+    gunicorn -c gunicorn.conf.py
+"""
+import os
+
+wsgi_app = 'wsgi:create_app()'
+preload_app = True
+
+bind = os.environ.get('DASHBOARD_BIND', '0.0.0.0:8050')
+# Rendering a view is CPU-bound Python, so one process per core; threads cover the cheap
+# cache-hit and static-file requests while a render is in progress
+workers = int(os.environ.get('DASHBOARD_WORKERS', 0)) or os.cpu_count() or 1
+threads = int(os.environ.get('DASHBOARD_THREADS', 4))
+worker_class = 'gthread'
+timeout = 60
+accesslog = '-'
+loglevel = os.environ.get('DASHBOARD_LOG_LEVEL', 'info')
+
@@ -0,0 +1,91 @@
+"""ARIMA order selection by AIC over a bounded (p, d, q) grid.
+
+The winning order for each series is memoised on disk together with the
+data it was chosen on. Later runs reuse it unless the series has grown by
+more than a few periods or its history has shifted noticeably, so the grid
+search is only paid for again when the data changes enough to matter.
+"""
+import itertools
+import json
+import logging
+import os
+import time
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+AUTO = 'auto'
+
+MAX_P = 2
+MAX_D = 1
+MAX_Q = 2
+
+# Search again once this many new periods have arrived since the last search...
+MAX_NEW_PERIODS = 2
+# ...or when the previously seen history moved by more than this (relative RMS)
+MAX_RELATIVE_CHANGE = 0.1
+
+
+def candidate_orders(max_p=MAX_P, max_d=MAX_D, max_q=MAX_Q):
+    return list(itertools.product(range(max_p + 1), range(max_d + 1), range(max_q + 1)))
+
+
+def fit_candidate(name, data, order, periods):
+    """Fit one (series, order) pair; returns ``(name, order, aic, entry, seconds, error)``"""
+    from statsmodels.tsa.arima.model import ARIMA
+
+    from forecasting import forecast_entry
+
+    started = time.perf_counter()
+    try:
+        model_fit = ARIMA(np.asarray(data, dtype='float64'), order=order).fit()
+        aic = float(model_fit.aic)
+        entry = forecast_entry(model_fit, periods)
+        if not np.isfinite(aic) or not np.all(np.isfinite(entry['forecast'])):
+            raise ValueError("non-finite fit")
+        error = None
+    except Exception as exc:
+        aic, entry = float('inf'), None
+        error = f"{type(exc).__name__}: {exc}"
+    return name, tuple(order), aic, entry, time.perf_counter() - started, error
+
+
+def needs_search(entry, data):
+    """True when ``data`` differs enough from the series an order was last chosen on"""
+    if entry is None:
+        return True
+    previous = np.asarray(entry['data'], dtype='float64')
+    data = np.asarray(data, dtype='float64')
+    if len(data) < len(previous) or len(data) - len(previous) > MAX_NEW_PERIODS:
+        return True
+
+    overlap = data[:len(previous)]
+    scale = np.sqrt(np.mean(previous ** 2)) or 1.0
+    return np.sqrt(np.mean((overlap - previous) ** 2)) / scale > MAX_RELATIVE_CHANGE
+
+
+class OrderMemo:
+    """Chosen order per series name, persisted as one JSON file"""
+
+    def __init__(self, directory):
+        self.path = os.path.join(directory, 'arima_orders.json')
+        try:
+            with open(self.path, encoding='utf-8') as handle:
+                self.entries = json.load(handle)
+        except (OSError, ValueError):
+            self.entries = {}
+
+    def get(self, name):
+        return self.entries.get(name)
+
+    def put(self, name, order, aic, data):
+        self.entries[name] = {'order': list(order), 'aic': aic, 'data': [float(value) for value in data]}
+
+    def save(self):
+        from forecasting import write_json
+
+        try:
+            write_json(self.path, self.entries)
+        except OSError:
+            logger.warning("Could not save ARIMA order memo to %s", self.path, exc_info=True)
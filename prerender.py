@@ -0,0 +1,64 @@
+"""Background warm-up of the view cache.
+
+Right after boot, and again whenever the cache is invalidated by new
+forecasts, every view is rendered for the most popular filters on a daemon
+thread, so the first visitor to each of those states gets a cache hit. The
+server is ready to answer requests while this runs. With a large catalog
+only 'all' and the best-selling products are pre-rendered
+(``DASHBOARD_PRERENDER_PRODUCTS``); the rest are rendered on first use.
+"""
+import logging
+import os
+import threading
+import time
+
+import numpy as np
+
+from sales_cube import ALL
+
+logger = logging.getLogger(__name__)
+
+PRERENDER_PRODUCTS = int(os.environ.get('DASHBOARD_PRERENDER_PRODUCTS', 8))
+
+# Outcome of the last completed warm-up: {'views', 'failed', 'seconds', 'finished_at'}
+status = {}
+_lock = threading.Lock()
+_threads = []
+
+
+def popular_filters(cube, limit=PRERENDER_PRODUCTS):
+    """'all' followed by the ``limit`` products with the most units sold"""
+    ranked = np.argsort(-cube.product_units, kind='stable')[:limit]
+    return [ALL] + [cube.products[position] for position in ranked]
+
+
+def warm(render, views, filters):
+    """Call ``render(view, filter)`` for every combination and return the seconds it took"""
+    with _lock:
+        started = time.perf_counter()
+        failed = 0
+        for coffee_filter in filters:
+            for view in views:
+                try:
+                    render(view, coffee_filter)
+                except Exception:
+                    failed += 1
+                    logger.exception("Pre-rendering %s / %s failed", view, coffee_filter)
+        seconds = time.perf_counter() - started
+        status.update(views=len(views) * len(filters), failed=failed, seconds=seconds, finished_at=time.time())
+    logger.info("Pre-rendered %d views (%d failed) in %.2fs", len(views) * len(filters), failed, seconds)
+    return seconds
+
+
+def start(render, views, filters):
+    thread = threading.Thread(target=warm, args=(render, list(views), list(filters)), name='view-prerender',
+                              daemon=True)
+    thread.start()
+    _threads.append(thread)
+    return thread
+
+
+def wait(timeout=None):
+    """Block until every warm-up started so far has finished"""
+    while _threads:
+        _threads.pop(0).join(timeout)
@@ -0,0 +1,102 @@
+"""Publishes the dashboard data to a shared-memory snapshot store.
+
+Run one refresher next to the server processes, with the same
+``DASHBOARD_SHARED_STORE`` name for both:
+
+    DASHBOARD_SHARED_STORE=coffee python refresher.py &
+    DASHBOARD_SHARED_STORE=coffee gunicorn -c gunicorn.conf.py
+
+The refresher loads the sales data, builds the cube and fits the forecasts,
+and publishes a snapshot whenever any of them change (see ``shared_store``).
+All the workers read that one copy. The data is reloaded when the files
+at ``DASHBOARD_DATA_PATH`` change (see ``data_watcher``) or on SIGHUP. Only
+the changed series are refitted, and the workers switch to the new snapshot
+without restarting.
+"""
+import argparse
+import logging
+import os
+import signal
+import threading
+
+import numpy as np
+
+from data_snapshot import load_cube, to_shared, unit_series
+from data_watcher import DataWatcher
+from forecasting import HORIZON, ForecastStore
+from shared_store import SharedSnapshotStore
+
+logger = logging.getLogger(__name__)
+
+
+class Refresher:
+    def __init__(self, store, path=None):
+        self.store = store
+        self.path = path
+        self._lock = threading.Lock()
+        self.cube = load_cube(path)
+        self.forecasts = ForecastStore(unit_series(self.cube), periods=HORIZON)
+        self.forecasts.subscribe(lambda forecasts: self.publish())
+
+    def start(self):
+        self.forecasts.start()
+        return self
+
+    def publish(self):
+        with self._lock:
+            arrays, meta = to_shared(self.cube, self.forecasts.forecasts, self.forecasts.ready,
+                                     self.forecasts.version)
+            return self.store.publish(arrays, meta)
+
+    def reload(self):
+        """Load the data again and publish it; forecasts of changed series follow once refitted"""
+        cube = load_cube(self.path)
+        if cube.version == self.cube.version:
+            logger.info("Sales data unchanged, nothing to publish")
+            return False
+        # A fit still running on the old data lands before the series are replaced
+        self.forecasts.wait()
+        with self._lock:
+            self.cube = cube
+        if not self.forecasts.refresh(unit_series(cube)):
+            self.publish()
+        return True
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--name', default=os.environ.get('DASHBOARD_SHARED_STORE', 'coffee-dashboard'),
+                        help="shared-memory store name (DASHBOARD_SHARED_STORE)")
+    parser.add_argument('--data-path', default=os.environ.get('DASHBOARD_DATA_PATH'),
+                        help="transaction files to load (DASHBOARD_DATA_PATH); demo data when unset")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s %(name)s: %(message)s')
+
+    # Same demo data as app.py when no path is configured
+    np.random.seed(42)
+    store = SharedSnapshotStore.create(args.name)
+    stop = threading.Event()
+    reload_requested = threading.Event()
+    signal.signal(signal.SIGHUP, lambda *_: reload_requested.set())
+    signal.signal(signal.SIGTERM, lambda *_: stop.set())
+    signal.signal(signal.SIGINT, lambda *_: stop.set())
+
+    try:
+        refresher = Refresher(store, args.data_path).start()
+        if args.data_path:
+            DataWatcher(args.data_path, reload_requested.set).start()
+        while not stop.is_set():
+            if reload_requested.wait(1):
+                reload_requested.clear()
+                logger.info("Reloading sales data")
+                try:
+                    refresher.reload()
+                except Exception:
+                    logger.exception("Reload failed; workers keep the current snapshot")
+    finally:
+        # Leaves the last snapshot for the workers to serve until the refresher is back
+        store.close()
+
+
+if __name__ == '__main__':
+    main()
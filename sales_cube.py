@@ -0,0 +1,116 @@
+"""Dense period x product x measure array built once per data load.
+
+Every filter the dashboard offers ('all' or a single coffee type) is answered
+from this cube by an index lookup: KPI summaries and pie data are precomputed
+per filter, and the yearly series are NumPy views into the cube instead of
+boolean-mask filtering of a long-format sales frame.
+"""
+import hashlib
+
+import numpy as np
+import pandas as pd
+
+UNITS = 0
+REVENUE = 1
+PRICE = 2
+MEASURES = ('Sales', 'Revenue', 'Price')
+
+ALL = 'all'
+
+
+class SalesCube:
+    def __init__(self, periods, products, values):
+        self.periods = np.asarray(periods)
+        self.products = list(products)
+        self.index = {name: position for position, name in enumerate(self.products)}
+        self.values = values
+        self.values.setflags(write=False)
+        # Identifies this data load, e.g. for keying caches of rendered views
+        digest = hashlib.sha256(np.ascontiguousarray(values).tobytes())
+        # Renamed products or shifted periods over the same numbers are new data too
+        digest.update(repr((self.products, self.periods.tolist())).encode())
+        self.version = digest.hexdigest()[:16]
+
+        units = values[:, :, UNITS]
+        revenue = values[:, :, REVENUE]
+        self.product_units = units.sum(axis=0)
+        self.product_revenue = revenue.sum(axis=0)
+        self.period_units = units.sum(axis=1)
+        self.period_revenue = revenue.sum(axis=1)
+        self.top_product = self.products[int(np.argmax(self.product_units))]
+
+        self._summaries = {ALL: self._summary(None)}
+        for name in self.products:
+            self._summaries[name] = self._summary(name)
+
+    @classmethod
+    def from_sales_data(cls, sales_data, products):
+        """Build the cube from a wide ``sales_data`` frame (one units and one price column per product)"""
+        units = sales_data[products].to_numpy(dtype='float64')
+        prices = sales_data[[name + 'Price' for name in products]].to_numpy(dtype='float64')
+
+        values = np.empty((len(sales_data), len(products), len(MEASURES)))
+        values[:, :, UNITS] = units
+        values[:, :, REVENUE] = np.nan_to_num(units * prices)
+        values[:, :, PRICE] = prices
+        return cls(sales_data['Year'].to_numpy(), products, values)
+
+    def resolve(self, coffee_filter):
+        """Normalise a filter value; anything that is not a known product means all products"""
+        return coffee_filter if coffee_filter in self.index else ALL
+
+    def series(self, coffee_filter, measure=UNITS):
+        """Yearly values of ``measure`` as a (period, product) view and the product names it covers"""
+        coffee_filter = self.resolve(coffee_filter)
+        if coffee_filter == ALL:
+            return self.values[:, :, measure], self.products
+        position = self.index[coffee_filter]
+        return self.values[:, position:position + 1, measure], [coffee_filter]
+
+    def summary(self, coffee_filter):
+        return self._summaries[self.resolve(coffee_filter)]
+
+    def period_means(self, coffee_filter, span=3):
+        """Average yearly units per block of ``span`` years: period labels, a (period, product) array and products"""
+        block, products = self.series(coffee_filter, UNITS)
+        starts = np.arange(0, len(self.periods), span)
+        means = np.add.reduceat(block, starts, axis=0) / np.diff(np.append(starts, len(self.periods)))[:, None]
+        labels = [f"{self.periods[start]}-{self.periods[min(start + span, len(self.periods)) - 1]}" for start in starts]
+        return labels, means.round().astype('int64'), products
+
+    def price_response(self, coffee_filter):
+        """Yearly (price, units) pairs sorted by price; 'all' uses the revenue-weighted average price"""
+        coffee_filter = self.resolve(coffee_filter)
+        if coffee_filter == ALL:
+            units = self.period_units
+            with np.errstate(invalid='ignore', divide='ignore'):
+                prices = self.period_revenue / units
+        else:
+            position = self.index[coffee_filter]
+            units = self.values[:, position, UNITS]
+            prices = self.values[:, position, PRICE]
+
+        known = ~np.isnan(prices)
+        order = np.argsort(prices[known], kind='stable')
+        return prices[known][order], units[known][order]
+
+    def _summary(self, product):
+        if product is None:
+            units = self.period_units
+            total_revenue = float(self.product_revenue.sum())
+            top_coffee = self.top_product
+            pie_data = pd.DataFrame({'Type': self.products, 'Sales': self.product_units.astype('int64')})
+        else:
+            position = self.index[product]
+            units = self.values[:, position, UNITS]
+            total_revenue = float(self.product_revenue[position])
+            top_coffee = product
+            pie_data = pd.DataFrame({'Type': [product], 'Sales': [int(self.product_units[position])]})
+
+        return {
+            'total_sales': int(units.sum()),
+            'yearly_avg': int(units.mean()),
+            'total_revenue': total_revenue,
+            'top_coffee': top_coffee,
+            'pie_data': pie_data
+        }
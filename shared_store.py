@@ -0,0 +1,287 @@
+"""Shared-memory snapshot store for sharing aggregates between processes.
+
+A publisher (``refresher.py``) writes each snapshot (a set of NumPy arrays
+plus a small JSON ``meta`` dict) into a new ``multiprocessing.shared_memory``
+segment, then points a small fixed header segment at it. Readers map the
+arrays straight out of the segment without copying, so every worker shares a
+single copy of the data. They switch snapshots by checking the header
+version; reads take no locks.
+
+The header is a seqlock: the publisher makes the sequence number odd while
+it rewrites the header and even again afterwards. A reader that sees an odd
+number, or a different number after reading, retries. Each publish creates a
+fresh data segment, and the previous one stays linked so readers that saw
+the old header can still attach to it. Older segments are unlinked; a
+reader's mapping of one lasts until the last array taken from it is freed,
+so requests still rendering from an old snapshot are unaffected.
+
+The header and the latest segments outlive the publisher: readers keep
+serving the last snapshot while it is down, and a restarted publisher takes
+over the same header and continues its versions, so readers attached to it
+pick up the new publishes without re-attaching.
+"""
+import json
+import logging
+import os
+import struct
+import sys
+import time
+from multiprocessing import resource_tracker, shared_memory
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+MAGIC = b'DASHSNAP'
+FORMAT_VERSION = 2
+# magic, format version, sequence, snapshot version, data segment name, previous data segment name
+HEADER = struct.Struct('<8sQQQ64s64s')
+SEQUENCE_OFFSET = 16
+# Manifest length prefix of a data segment; arrays start on this alignment
+ALIGNMENT = 64
+# A header rewrite takes microseconds; a sequence number still odd after this means the publisher died mid-write
+HEADER_TIMEOUT = 0.5
+
+
+def _attach(name):
+    try:
+        return shared_memory.SharedMemory(name, track=False)
+    except TypeError:
+        # Before Python 3.13 attaching always registers the segment with the resource tracker, which would
+        # unlink it (and warn about a leak) when this process exits although the publisher still owns it
+        segment = shared_memory.SharedMemory(name)
+        resource_tracker.unregister(segment._name, 'shared_memory')
+        return segment
+
+
+def _create(name, size):
+    # Untracked, so the resource tracker does not unlink it when the publisher exits or dies
+    try:
+        return shared_memory.SharedMemory(name, create=True, size=size, track=False)
+    except TypeError:
+        segment = shared_memory.SharedMemory(name, create=True, size=size)
+        resource_tracker.unregister(segment._name, 'shared_memory')
+        return segment
+
+
+def _unlink(segment):
+    if sys.version_info < (3, 13):
+        # unlink() also unregisters the segment from the resource tracker, which never had it
+        resource_tracker.register(segment._name, 'shared_memory')
+    segment.unlink()
+
+
+def _aligned(offset):
+    return -(-offset // ALIGNMENT) * ALIGNMENT
+
+
+def write_segment(name, version, arrays, meta):
+    """Create the data segment ``name`` holding ``arrays`` and ``meta``"""
+    arrays = {key: np.ascontiguousarray(value) for key, value in arrays.items()}
+    layout = {}
+    offset = 0
+    for key, value in arrays.items():
+        layout[key] = {'dtype': value.dtype.str, 'shape': value.shape, 'offset': offset}
+        offset = _aligned(offset + value.nbytes)
+    manifest = json.dumps({'version': version, 'meta': meta, 'arrays': layout}).encode()
+    start = _aligned(8 + len(manifest))
+
+    segment = _create(name, max(start + offset, 1))
+    struct.pack_into('<Q', segment.buf, 0, len(manifest))
+    segment.buf[8:8 + len(manifest)] = manifest
+    for key, value in arrays.items():
+        position = start + layout[key]['offset']
+        segment.buf[position:position + value.nbytes] = value.reshape(-1).view('uint8')
+    return segment
+
+
+class _Mapping:
+    """A segment's memory as a NumPy byte array whose base keeps the segment open.
+
+    Arrays built straight on ``segment.buf`` only reference the underlying
+    mmap, which ``SharedMemory.close()`` (also run when it is garbage
+    collected) unmaps under them. Arrays sliced from ``bytes`` chain back to
+    this object and so to the segment, which stays mapped until the last
+    array that uses it is freed.
+    """
+
+    def __init__(self, segment):
+        self.segment = segment
+        address = np.frombuffer(segment.buf, dtype='uint8').ctypes.data
+        self.__array_interface__ = {'shape': (segment.size,), 'typestr': '|u1', 'data': (address, True),
+                                    'version': 3}
+        self.bytes = np.asarray(self)
+
+
+def read_segment(segment):
+    """``(version, arrays, meta)`` of a data segment; the arrays are read-only views that keep it mapped"""
+    length, = struct.unpack_from('<Q', segment.buf, 0)
+    manifest = json.loads(bytes(segment.buf[8:8 + length]))
+    start = _aligned(8 + length)
+    memory = _Mapping(segment).bytes
+    arrays = {}
+    for key, spec in manifest['arrays'].items():
+        dtype = np.dtype(spec['dtype'])
+        shape = tuple(spec['shape'])
+        offset = start + spec['offset']
+        array = memory[offset:offset + dtype.itemsize * int(np.prod(shape))].view(dtype).reshape(shape)
+        array.setflags(write=False)
+        arrays[key] = array
+    return manifest['version'], arrays, manifest['meta']
+
+
+class Snapshot:
+    """One published snapshot mapped into this process"""
+
+    def __init__(self, segment):
+        self.segment = segment
+        self.version, self.arrays, self.meta = read_segment(segment)
+
+
+class SharedSnapshotStore:
+    """Publisher and reader side of a snapshot store named ``name``.
+
+    ``create`` makes the publishing side (one process), ``attach`` a reader.
+    """
+
+    def __init__(self, name, header, owner):
+        self.name = name
+        self.header = header
+        self.owner = owner
+        self._segments = []
+        self._snapshot = None
+
+    @classmethod
+    def create(cls, name):
+        """Publisher side of the store.
+
+        Takes over the header a previous publisher left behind, with its
+        latest segments, and continues its versions.
+        """
+        try:
+            header = _attach(name)
+        except FileNotFoundError:
+            header = None
+        if header is not None:
+            magic, format_version, sequence, version, segment_name, previous_name = HEADER.unpack_from(header.buf, 0)
+            if magic == MAGIC and format_version == FORMAT_VERSION:
+                if sequence % 2:
+                    # The previous publisher died halfway through a publish; the next one rewrites the header
+                    struct.pack_into('<Q', header.buf, SEQUENCE_OFFSET, sequence + 1)
+                store = cls(name, header, owner=True)
+                for adopted in (previous_name, segment_name):
+                    adopted = adopted.rstrip(b'\0').decode()
+                    try:
+                        if adopted:
+                            store._segments.append(_attach(adopted))
+                    except FileNotFoundError:
+                        pass
+                logger.info("Taking over snapshot store %r at version %d", name, version)
+                return store
+            # Left behind by an incompatible version
+            header.close()
+            _unlink(header)
+            logger.warning("Replaced a stale snapshot store %r", name)
+        header = _create(name, HEADER.size)
+        HEADER.pack_into(header.buf, 0, MAGIC, FORMAT_VERSION, 0, 0, b'', b'')
+        return cls(name, header, owner=True)
+
+    @classmethod
+    def attach(cls, name, timeout=0):
+        """Reader side of the store; waits up to ``timeout`` seconds for the publisher's first snapshot"""
+        deadline = time.monotonic() + timeout
+        while True:
+            try:
+                header = _attach(name)
+                break
+            except FileNotFoundError:
+                if time.monotonic() >= deadline:
+                    raise
+                time.sleep(0.1)
+        magic, format_version = HEADER.unpack_from(header.buf, 0)[:2]
+        if magic != MAGIC or format_version != FORMAT_VERSION:
+            header.close()
+            raise ValueError(f"{name!r} is not a version {FORMAT_VERSION} snapshot store")
+
+        store = cls(name, header, owner=False)
+        while not store.version:
+            if time.monotonic() >= deadline:
+                store.close()
+                raise TimeoutError(f"No snapshot was published to {name!r} within {timeout}s")
+            time.sleep(0.1)
+        return store
+
+    def _read_header(self, timeout=HEADER_TIMEOUT):
+        deadline = time.monotonic() + timeout
+        while True:
+            sequence = struct.unpack_from('<Q', self.header.buf, SEQUENCE_OFFSET)[0]
+            if sequence % 2 == 0:
+                _, _, _, version, segment_name, _ = HEADER.unpack_from(self.header.buf, 0)
+                if struct.unpack_from('<Q', self.header.buf, SEQUENCE_OFFSET)[0] == sequence:
+                    return version, segment_name.rstrip(b'\0').decode()
+            if time.monotonic() >= deadline:
+                logger.warning("The header of %r stayed mid-update for %ss; was the publisher stopped?",
+                               self.name, timeout)
+                raise TimeoutError(f"The header of {self.name!r} stayed mid-update for {timeout}s")
+            time.sleep(0)
+
+    @property
+    def version(self):
+        """Version of the latest published snapshot, 0 before the first publish.
+
+        Raises TimeoutError when the publisher stopped halfway through updating the header.
+        """
+        return self._read_header()[0]
+
+    def publish(self, arrays, meta=None):
+        """Write a new snapshot and make it current; returns its version"""
+        version = self.version + 1
+        segment = write_segment(f'{self.name}-{os.getpid()}-{version}', version, arrays, meta or {})
+
+        sequence = struct.unpack_from('<Q', self.header.buf, SEQUENCE_OFFSET)[0]
+        struct.pack_into('<Q', self.header.buf, SEQUENCE_OFFSET, sequence + 1)
+        previous = self._segments[-1].name if self._segments else ''
+        HEADER.pack_into(self.header.buf, 0, MAGIC, FORMAT_VERSION, sequence + 1, version,
+                         segment.name.encode(), previous.encode())
+        struct.pack_into('<Q', self.header.buf, SEQUENCE_OFFSET, sequence + 2)
+
+        self._segments.append(segment)
+        # Keep the previous segment linked for readers that saw the old header a moment ago
+        while len(self._segments) > 2:
+            old = self._segments.pop(0)
+            old.close()
+            _unlink(old)
+        logger.info("Published snapshot %d of %r (%d bytes)", version, self.name, segment.size)
+        return version
+
+    def snapshot(self):
+        """The current ``Snapshot``, mapped on first use and kept until a newer one is published"""
+        version, segment_name = self._read_header()
+        current = self._snapshot
+        if current is not None and current.version == version:
+            return current
+        if not segment_name:
+            return None
+        try:
+            self._snapshot = Snapshot(_attach(segment_name))
+        except FileNotFoundError:
+            # Superseded and unlinked between reading the header and attaching: read the header again
+            return self.snapshot()
+        return self._snapshot
+
+    def close(self, unlink=False):
+        """Unmap the store.
+
+        A publisher leaves the header and its latest segments in place for
+        readers and the next publisher, unless ``unlink`` is set.
+        """
+        self._snapshot = None
+        if self.owner:
+            for segment in self._segments:
+                segment.close()
+                if unlink:
+                    _unlink(segment)
+            self._segments = []
+        self.header.close()
+        if self.owner and unlink:
+            _unlink(self.header)
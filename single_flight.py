@@ -0,0 +1,70 @@
+"""Coalescing of identical concurrent computations.
+
+When several threads ask for the same key at the same time, only the first
+one (the leader) runs the computation. The others wait for it and share its
+result, or its exception. Nothing is kept once the leader finishes: a call
+that starts after that computes again, and caching is up to the caller (see
+``ViewCache``). ``stats()`` counts the computations the coalescing saved.
+"""
+import threading
+
+
+class _Flight:
+    __slots__ = ('done', 'result', 'error', 'waiters')
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+        self.waiters = 0
+
+
+class SingleFlight:
+    def __init__(self):
+        self.calls = 0
+        self.computations = 0
+        self.coalesced = 0
+        self.max_waiters = 0
+        self._flights = {}
+        self._lock = threading.Lock()
+
+    def do(self, key, function):
+        """``function()``, or the result of the identical call already in flight for ``key``"""
+        with self._lock:
+            self.calls += 1
+            flight = self._flights.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._flights[key] = _Flight()
+                self.computations += 1
+            else:
+                flight.waiters += 1
+                self.coalesced += 1
+                self.max_waiters = max(self.max_waiters, flight.waiters)
+
+        if not leader:
+            flight.done.wait()
+            if flight.error is not None:
+                raise flight.error
+            return flight.result
+
+        try:
+            flight.result = function()
+        except Exception as error:
+            flight.error = error
+            raise
+        finally:
+            with self._lock:
+                del self._flights[key]
+            flight.done.set()
+        return flight.result
+
+    def stats(self):
+        with self._lock:
+            return {
+                'calls': self.calls,
+                'computations': self.computations,
+                'coalesced': self.coalesced,
+                'in_flight': len(self._flights),
+                'max_waiters': self.max_waiters
+            }
@@ -0,0 +1,62 @@
+import numpy as np
+import pytest
+from flask import Flask
+
+import api
+from data_snapshot import DataSnapshot
+from sales_cube import PRICE, REVENUE, UNITS, SalesCube
+
+
+@pytest.fixture
+def data():
+    values = np.zeros((3, 2, 3))
+    values[:, :, UNITS] = [[10, 20], [12, 18], [15, 25]]
+    values[:, :, PRICE] = [[3.0, 4.0], [3.5, 4.0], [4.0, 4.5]]
+    values[:, :, REVENUE] = values[:, :, UNITS] * values[:, :, PRICE]
+    cube = SalesCube([2021, 2022, 2023], ['Latte', 'Mocha'], values)
+    forecast = {key: np.array([16.0, 17.0]) for key in ('forecast', 'lower', 'upper')}
+    return DataSnapshot(cube, {'Latte': forecast}, horizon=2)
+
+
+@pytest.fixture
+def client(data):
+    return api.install(Flask(__name__), lambda: data).test_client()
+
+
+def test_response_is_tagged_with_the_data_version(client, data):
+    response = client.get('/api/v1/aggregates/Latte?start=2022')
+    assert response.status_code == 200
+    assert response.headers['ETag'] == f'W/"{data.version}"'
+    body = response.get_json()
+    assert body['version'] == data.version
+    assert body['years'] == [2022, 2023]
+    assert body['units'] == [12.0, 15.0]
+
+
+def test_matching_etag_gets_304(client, data):
+    response = client.get('/api/v1/products', headers={'If-None-Match': f'W/"{data.version}"'})
+    assert response.status_code == 304
+    assert response.data == b''
+
+    assert client.get('/api/v1/products', headers={'If-None-Match': 'W/"older"'}).status_code == 200
+
+
+def test_bad_year_is_400(client):
+    response = client.get('/api/v1/aggregates/all?start=abc')
+    assert response.status_code == 400
+    assert response.get_json() == {'error': "start must be a year, got 'abc'"}
+
+
+def test_unknown_product_is_404(client):
+    for endpoint in ('aggregates', 'forecasts'):
+        response = client.get(f'/api/v1/{endpoint}/Frappe')
+        assert response.status_code == 404
+        assert response.get_json() == {'error': "Unknown product 'Frappe'"}
+
+
+def test_forecasts_report_pending_products(client):
+    body = client.get('/api/v1/forecasts/all').get_json()
+    assert body['years'] == [2024, 2025]
+    assert not body['ready']
+    assert body['unavailable'] == []
+    assert body['forecasts'] == {'Latte': {key: [16.0, 17.0] for key in ('forecast', 'lower', 'upper')}}
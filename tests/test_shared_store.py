@@ -0,0 +1,107 @@
+import gc
+import os
+import struct
+from multiprocessing import shared_memory
+
+import numpy as np
+import pytest
+
+import shared_store
+from shared_store import SEQUENCE_OFFSET, SharedSnapshotStore
+
+
+@pytest.fixture
+def publisher():
+    store = SharedSnapshotStore.create(f'test-store-{os.getpid()}')
+    yield store
+    store.close(unlink=True)
+
+
+def test_publish_attach_republish(publisher):
+    publisher.publish({'values': np.arange(6, dtype='float64').reshape(2, 3)}, {'products': ['a', 'b']})
+    reader = SharedSnapshotStore.attach(publisher.name)
+    try:
+        first = reader.snapshot()
+        assert first.version == 1
+        assert first.meta == {'products': ['a', 'b']}
+        np.testing.assert_array_equal(first.arrays['values'], np.arange(6).reshape(2, 3))
+        assert not first.arrays['values'].flags.writeable
+        assert reader.snapshot() is first
+
+        old_values = first.arrays['values']
+        publisher.publish({'values': np.ones((2, 3))}, {'products': ['a', 'b']})
+        second = reader.snapshot()
+        assert second.version == reader.version == 2
+        np.testing.assert_array_equal(second.arrays['values'], np.ones((2, 3)))
+        # A render still holding arrays of the previous snapshot keeps reading them
+        np.testing.assert_array_equal(old_values, np.arange(6).reshape(2, 3))
+    finally:
+        reader.close()
+
+
+def test_arrays_outlive_their_snapshot_and_unlinked_segment(publisher):
+    publisher.publish({'values': np.arange(4.0)})
+    reader = SharedSnapshotStore.attach(publisher.name)
+    try:
+        values = reader.snapshot().arrays['values']
+        # Two more publishes unlink the first segment and drop the reader's snapshot of it
+        publisher.publish({'values': np.zeros(4)})
+        publisher.publish({'values': np.zeros(4)})
+        assert reader.snapshot().version == 3
+        gc.collect()
+        np.testing.assert_array_equal(values, np.arange(4.0))
+    finally:
+        reader.close()
+
+
+def test_header_stuck_mid_update_times_out(publisher):
+    publisher.publish({'values': np.arange(4.0)})
+    reader = SharedSnapshotStore.attach(publisher.name)
+    try:
+        sequence = struct.unpack_from('<Q', publisher.header.buf, SEQUENCE_OFFSET)[0]
+        struct.pack_into('<Q', publisher.header.buf, SEQUENCE_OFFSET, sequence + 1)
+        with pytest.raises(TimeoutError):
+            reader._read_header(timeout=0.05)
+    finally:
+        reader.close()
+
+
+def test_restarted_publisher_takes_over():
+    publisher = SharedSnapshotStore.create(f'test-store-{os.getpid()}')
+    publisher.publish({'values': np.arange(4.0)})
+    reader = SharedSnapshotStore.attach(publisher.name)
+    try:
+        assert reader.snapshot().version == 1
+        first_segment = publisher._segments[0].name
+        publisher.close()
+        # Readers keep the last snapshot while no publisher is running
+        np.testing.assert_array_equal(reader.snapshot().arrays['values'], np.arange(4.0))
+
+        restarted = SharedSnapshotStore.create(publisher.name)
+        try:
+            assert restarted.publish({'values': np.ones(4)}) == 2
+            assert reader.snapshot().version == 2
+            np.testing.assert_array_equal(reader.snapshot().arrays['values'], np.ones(4))
+            # The previous publisher's segments are cleaned up like its own
+            restarted.publish({'values': np.zeros(4)})
+            with pytest.raises(FileNotFoundError):
+                shared_memory.SharedMemory(first_segment)
+        finally:
+            restarted.close(unlink=True)
+    finally:
+        reader.close()
+
+
+def test_publisher_takes_over_a_header_left_mid_update():
+    publisher = SharedSnapshotStore.create(f'test-store-{os.getpid()}')
+    publisher.publish({'values': np.arange(4.0)})
+    sequence = struct.unpack_from('<Q', publisher.header.buf, SEQUENCE_OFFSET)[0]
+    struct.pack_into('<Q', publisher.header.buf, SEQUENCE_OFFSET, sequence + 1)
+    publisher.close()
+
+    restarted = SharedSnapshotStore.create(publisher.name)
+    try:
+        assert restarted.version == 1
+        assert restarted.publish({'values': np.ones(4)}) == 2
+    finally:
+        restarted.close(unlink=True)
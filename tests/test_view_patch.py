@@ -0,0 +1,98 @@
+import copy
+
+from dash import Patch
+
+import view_patch
+
+
+def apply(tree, operations):
+    """Apply ``diff`` operations to a copy of ``tree`` the way the browser applies a patch"""
+    tree = copy.deepcopy(tree)
+    for operation in operations:
+        *location, key = operation[1]
+        target = tree
+        for step in location:
+            target = target[step]
+        if operation[0] == 'set':
+            target[key] = operation[2]
+        else:
+            del target[key]
+    return tree
+
+
+def apply_patch(tree, patch):
+    """Apply the operations of a serialized ``dash.Patch`` to a copy of ``tree``"""
+    operations = []
+    for operation in patch.to_plotly_json()['operations']:
+        if operation['operation'] == 'Assign':
+            operations.append(('set', tuple(operation['location']), operation['params']['value']))
+        else:
+            operations.append(('delete', tuple(operation['location'])))
+    return apply(tree, operations)
+
+
+def card(text, y):
+    return {
+        'type': 'Div',
+        'props': {
+            'children': [
+                {'type': 'H5', 'props': {'children': text}},
+                {'type': 'Graph', 'props': {'figure': {'data': [{'y': y, 'name': 'Latte'}]}}}
+            ]
+        }
+    }
+
+
+def test_diff_reaches_new_tree():
+    cases = [
+        # changed text and trace values deep in the tree
+        (card('1,000', [1, 2, 3]), card('2,000', [4, 5, 6])),
+        # dict key deleted and added
+        ({'props': {'style': {'color': 'red'}, 'id': 'a'}}, {'props': {'id': 'a', 'className': 'b'}}),
+        # list of containers that changed length
+        ({'children': [card('a', [1]), card('b', [2])]}, {'children': [card('a', [1])]}),
+        # plain-value list of a different length
+        ({'x': [2020, 2021]}, {'x': [2020, 2021, 2022]}),
+        # typed-array trace data
+        ({'y': {'dtype': 'f8', 'bdata': 'AAAAAAAA8D8='}}, {'y': {'dtype': 'i4', 'bdata': 'AQAAAA==', 'shape': '1'}}),
+        # value changing type
+        ({'children': 'text'}, {'children': [card('a', [1])]}),
+    ]
+    for old, new in cases:
+        assert apply(old, view_patch.diff(old, new)) == new
+
+
+def test_diff_of_equal_trees_is_empty():
+    assert view_patch.diff(card('a', [1, 2]), card('a', [1, 2])) == []
+
+
+def test_diff_replaces_leaf_lists_whole():
+    assert view_patch.diff({'y': [1, 2, 3]}, {'y': [1, 9, 3]}) == [('set', ('y',), [1, 9, 3])]
+
+
+def test_patch_or_replace_sends_small_changes_as_patch():
+    old = {'children': [card('1,000', [1, 2, 3]), {'type': 'Div', 'props': {'children': 'static ' * 100}}]}
+    new = copy.deepcopy(old)
+    new['children'][0] = card('2,000', [1, 2, 3])
+
+    patch = view_patch.patch_or_replace(old, new)
+    assert isinstance(patch, Patch)
+    assert apply_patch(old, patch) == new
+
+
+def test_patch_or_replace_applies_deletions():
+    old = {'props': {'id': 'view', 'style': {'color': 'red'}, 'children': 'static ' * 100}}
+    new = {'props': {'id': 'view', 'children': 'static ' * 100}}
+
+    patch = view_patch.patch_or_replace(old, new)
+    assert isinstance(patch, Patch)
+    assert apply_patch(old, patch) == new
+
+
+def test_patch_or_replace_falls_back_to_the_new_tree():
+    # Different at the root
+    assert view_patch.patch_or_replace('old', {'type': 'Div'}) == {'type': 'Div'}
+    # Changes larger than the size threshold
+    old, new = card('a', list(range(100))), card('b', list(range(100, 200)))
+    assert view_patch.patch_or_replace(old, new) is new
+    assert isinstance(view_patch.patch_or_replace(old, new, max_share=1.0), Patch)
@@ -0,0 +1,117 @@
+"""Bounded LRU cache for rendered views.
+
+Entries are the serialized JSON of a view's component tree, so the memory
+they hold is known exactly and a hit only costs a JSON decode: Dash sends
+the decoded ``{'type', 'namespace', 'props'}`` dicts to the browser exactly as
+it would the original components. Both directions use orjson when it is
+installed (plotly picks it up for encoding). Every lookup carries a version
+token for the data the view was rendered from; when the token changes the
+whole cache is dropped, so a data reload or a new set of forecasts can never
+serve a stale view. Concurrent misses for the same view and version are
+rendered once and shared (see ``single_flight``), so a burst of identical
+page loads costs one render.
+"""
+import logging
+import os
+import threading
+from collections import OrderedDict
+
+from plotly.io.json import to_json_plotly
+
+from single_flight import SingleFlight
+
+try:
+    from orjson import loads
+except ImportError:
+    from json import loads
+
+logger = logging.getLogger(__name__)
+
+VIEW_CACHE_BYTES = int(float(os.environ.get('DASHBOARD_VIEW_CACHE_MB', 64)) * 1024 * 1024)
+
+
+class ViewCache:
+    def __init__(self, max_bytes=VIEW_CACHE_BYTES):
+        self.max_bytes = max_bytes
+        self.version = None
+        self.entries = OrderedDict()
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.flights = SingleFlight()
+        self._lock = threading.Lock()
+
+    def _check_version(self, version):
+        if version != self.version:
+            if self.entries:
+                logger.info("Data version changed, dropping %d cached views", len(self.entries))
+            self.entries.clear()
+            self.bytes = 0
+            self.version = version
+
+    def get(self, key, version):
+        """Decoded view for ``key`` rendered from ``version`` of the data, or None"""
+        with self._lock:
+            self._check_version(version)
+            payload = self.entries.get(key)
+            if payload is None:
+                self.misses += 1
+                return None
+            self.entries.move_to_end(key)
+            self.hits += 1
+        return loads(payload)
+
+    def put(self, key, version, view):
+        """Serialize and store ``view``; returns the decoded copy that is now cached"""
+        return loads(self._store(key, version, view))
+
+    def _store(self, key, version, view):
+        payload = to_json_plotly(view).encode()
+        with self._lock:
+            self._check_version(version)
+            if len(payload) > self.max_bytes:
+                logger.warning("View %r is %d bytes, larger than the whole cache; not cached", key, len(payload))
+                return payload
+            previous = self.entries.pop(key, None)
+            if previous is not None:
+                self.bytes -= len(previous)
+            self.entries[key] = payload
+            self.bytes += len(payload)
+            while self.bytes > self.max_bytes:
+                _, evicted = self.entries.popitem(last=False)
+                self.bytes -= len(evicted)
+                self.evictions += 1
+        return payload
+
+    def get_or_render(self, key, version, render):
+        view = self.get(key, version)
+        if view is None:
+            # Callers that miss while the same view is being rendered wait for it; each decodes its own copy
+            view = loads(self.flights.do((key, version), lambda: self._store(key, version, render())))
+        return view
+
+    def __contains__(self, key):
+        return key in self.entries
+
+    def clear(self):
+        with self._lock:
+            self.entries.clear()
+            self.bytes = 0
+
+    def stats(self):
+        flights = self.flights.stats()
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'entries': len(self.entries),
+                'bytes': self.bytes,
+                'max_bytes': self.max_bytes,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'hit_rate': self.hits / lookups if lookups else None,
+                # Misses that waited for a render already in flight instead of rendering again
+                'renders': flights['computations'],
+                'coalesced': flights['coalesced']
+            }
@@ -0,0 +1,71 @@
+"""Targeted updates between two rendered views.
+
+Views come out of the ``ViewCache`` as plain JSON component trees, so the
+difference between the tree the browser is showing and the one for a new
+filter can be worked out here and sent as a ``dash.Patch``. Only the trace
+data, KPI text and other props that actually changed cross the wire, and
+components that did not change (static cards, the demographics pie) are
+left mounted in the browser.
+"""
+import json
+
+from dash import Patch
+
+# Send the full tree instead once the changes make up this share of it
+MAX_PATCH_SHARE = 0.5
+
+
+def _is_leaf_list(value):
+    return not any(isinstance(item, (dict, list)) for item in value)
+
+
+def diff(old, new, path=()):
+    """``('set', path, value)`` / ``('delete', path)`` operations turning ``old`` into ``new``.
+
+    Lists of plain values (trace coordinates and the like) are replaced as a
+    whole; dicts and equally long lists of containers are compared item by item.
+    """
+    if type(old) is not type(new):
+        return [('set', path, new)]
+    if isinstance(new, dict):
+        operations = []
+        for key, value in new.items():
+            if key not in old:
+                operations.append(('set', path + (key,), value))
+            else:
+                operations.extend(diff(old[key], value, path + (key,)))
+        operations.extend(('delete', path + (key,)) for key in old if key not in new)
+        return operations
+    if isinstance(new, list):
+        if len(old) != len(new) or _is_leaf_list(new):
+            return [] if old == new else [('set', path, new)]
+        operations = []
+        for index, (old_item, new_item) in enumerate(zip(old, new)):
+            operations.extend(diff(old_item, new_item, path + (index,)))
+        return operations
+    return [] if old == new else [('set', path, new)]
+
+
+def to_patch(operations):
+    patch = Patch()
+    for operation in operations:
+        *location, key = operation[1]
+        target = patch
+        for step in location:
+            target = target[step]
+        if operation[0] == 'set':
+            target[key] = operation[2]
+        else:
+            del target[key]
+    return patch
+
+
+def patch_or_replace(old, new, max_share=MAX_PATCH_SHARE):
+    """A ``Patch`` from ``old`` to ``new``, or ``new`` itself when the patch would not be much smaller"""
+    operations = diff(old, new)
+    if any(not operation[1] for operation in operations):
+        return new
+    changed = sum(len(json.dumps(operation[2])) for operation in operations if operation[0] == 'set')
+    if changed > max_share * len(json.dumps(new)):
+        return new
+    return to_patch(operations)
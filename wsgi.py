@@ -0,0 +1,42 @@
+"""WSGI entry point for running the dashboard under gunicorn.
+
+``create_app`` does all of the expensive start-up work in one process: it
+loads the sales data, builds the cube, waits for the forecasts and for the
+view cache warm-up. With ``preload_app`` (see ``gunicorn.conf.py``) that
+process is the gunicorn master, and every worker forked from it shares the
+loaded arrays, forecasts and cached views copy-on-write instead of building
+its own.
+
+    gunicorn -c gunicorn.conf.py
+"""
+import gc
+import logging
+import time
+
+logger = logging.getLogger(__name__)
+
+
+def create_app():
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s %(process)d %(name)s: %(message)s')
+    started = time.perf_counter()
+    import app
+    import prerender
+
+    # Background threads do not survive a fork: finish their work here so the workers inherit the results
+    if app.forecast_store is not None:
+        app.forecast_store.wait()
+    prerender.wait()
+    app.serve_layout()
+    if app.DATA_PATH and app.shared_store is None:
+        # A watcher per worker would reload and refit the same files once per worker, each into a private copy
+        logger.warning("Not watching %s for changes: run refresher.py with DASHBOARD_SHARED_STORE to reload "
+                       "data files without restarting", app.DATA_PATH)
+
+    # Move everything loaded so far out of the garbage collector's reach, so collections in the workers
+    # do not write to (and so copy) the pages shared with the master
+    gc.collect()
+    gc.freeze()
+    logger.info("Dashboard loaded in %.2fs: %d products, %d cached views, %d objects frozen",
+                time.perf_counter() - started, len(app.current().catalog), app.view_cache.stats()['entries'],
+                gc.get_freeze_count())
+    return app.server